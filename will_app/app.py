@@ -1,60 +1,119 @@
-from flask import Flask, session, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, session, redirect
 import os
-from datetime import datetime
-import json
+import atexit
+
+
+def create_app(config=None, start_background=True):
+    """
+    Build the app from a Config class (default: config.Config). Outside DEBUG
+    it refuses to start without a SECRET_KEY from the environment.
+    start_background=False leaves the job workers to be started later - a
+    preloading server starts them in each worker after the fork (gunicorn.conf.py).
+    """
+    from config import Config
+    config = config or Config
+
+    # The key signs the session id cookie: never serve with the public default
+    if config.SECRET_KEY == 'dev-key-change-in-production' and not config.DEBUG:
+        raise RuntimeError("SECRET_KEY is not set - set SECRET_KEY (or FLASK_DEBUG=1 for development)")
 
-def create_app():
     app = Flask(__name__)
-    app.secret_key = 'dev-key-change-in-production'
-    
+    app.config.from_object(config)
+    app.secret_key = config.SECRET_KEY
+
+    # Keep form drafts server-side; the cookie only carries the session id
+    from services.session_store import create_session_interface
+    session_interface = create_session_interface(config)
+    if session_interface:
+        app.session_interface = session_interface
+
     # Register blueprints
     from routes.form_steps import form_steps_bp
     from routes.admin_routes import admin_bp
-    
+    from routes.api_routes import api_bp
+
     app.register_blueprint(form_steps_bp)
     app.register_blueprint(admin_bp, url_prefix='/admin')
-    
+    app.register_blueprint(api_bp, url_prefix='/api')
+    _register_core_routes(app)
+
+    # Per-request latency histograms (exported on /metrics)
+    from logic import metrics
+    metrics.init_app(app)
+
+    # Fingerprinted static assets with long-lived cache headers
+    from logic import static_assets
+    static_assets.init_app(app)
+
+    if start_background:
+        start_background_services()
+
     return app
 
-app = create_app()
-
-@app.route('/')
-def home():
-    # Initialize session data if not exists
-    if 'form_data' not in session:
-        session['form_data'] = {
-            'current_step': 1,
-            'step1': {},
-            'step2': {}, 
-            'step3': {},
-            'step4': {},
-            'step5': {}
-        }
-    return redirect('/step/1')
-
-@app.route('/health')
-def health_check():
-    return {'status': 'healthy', 'message': 'Will App is running'}
-
-# FORM DATA ROUTE FOR AUTO-FILL
-@app.route('/get-form-data')
-def get_form_data():
-    """Provide form data for auto-fill functionality"""
-    form_data = session.get('form_data', {})
-    return jsonify({
-        'success': True,
-        'form_data': form_data
-    })
+
+def start_background_services():
+    """
+    Render workers, then background document jobs: resume persisted work,
+    drain on exit. The render pool forks first, before any thread is running.
+    """
+    from logic.render_pool import shutdown_render_pool, start_render_pool
+    from services.job_service import JobService
+    start_render_pool()
+    JobService.start()
+    atexit.register(shutdown_render_pool)
+    atexit.register(JobService.shutdown)
+
+
+def _register_core_routes(app):
+    @app.route('/')
+    def home():
+        # Initialize session data if not exists
+        if 'form_data' not in session:
+            session['form_data'] = {
+                'current_step': 1,
+                'step1': {},
+                'step2': {},
+                'step3': {},
+                'step4': {},
+                'step5': {}
+            }
+        return redirect('/step/1')
+
+    @app.route('/health')
+    def health_check():
+        return {'status': 'healthy', 'message': 'Will App is running'}
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Stage and request latency histograms in Prometheus text format"""
+        from logic.metrics import render_prometheus
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+def __getattr__(name):
+    # `from app import app` keeps working, but the module-level app (and its
+    # job workers) is only built when someone asks for it - a preloading
+    # server imports create_app without starting anything (see wsgi.py)
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == '__main__':
     # Create necessary directories
     os.makedirs('storage/generated_documents', exist_ok=True)
     os.makedirs('storage/excel_logs', exist_ok=True)
     os.makedirs('storage/templates', exist_ok=True)
-    
+
+    from config import DevelopmentConfig
+    app = create_app(DevelopmentConfig)
+
     print("🚀 Starting Absolute Wills application...")
     print("📍 Admin portal: http://localhost:5000/admin")
     print("📍 Main app: http://localhost:5000")
     print("📍 Health check: http://localhost:5000/health")
-    
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    print("📍 Production: gunicorn -c gunicorn.conf.py")
+
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,146 @@
+"""
+Offline batch will generation.
+
+Reads a CSV or JSONL file of submissions that use the same field names as the
+web form (name, exec1_name, beneficiary_1_name, poa_name_one, ...) and runs
+each row through the normal pipeline: validation, context assembly, main and
+mirror will rendering, and submission logging. Rows are spread across a pool
+of worker processes.
+
+    python batch_generate.py intake.csv --workers 4 --report intake_report.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+def read_rows(path, fmt=None):
+    """
+    Yield (row_number, form_data, error) from a CSV or JSONL file. A JSONL line
+    that is not a JSON object comes with form_data None and the reason in error.
+    """
+    fmt = fmt or ("jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        if fmt == "jsonl":
+            for n, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    form_data = json.loads(line)
+                except ValueError as e:
+                    yield n, None, f"Invalid JSON: {e}"
+                    continue
+                if isinstance(form_data, dict):
+                    yield n, form_data, None
+                else:
+                    yield n, None, "Expected a JSON object"
+        else:
+            for n, row in enumerate(csv.DictReader(fh), start=2):
+                yield n, {k.strip(): (v or "").strip() for k, v in row.items() if k}, None
+
+
+def row_result(row_number, name="", status="ok", error=""):
+    """Report entry for one input row"""
+    return {
+        "row": row_number,
+        "name": name,
+        "status": status,
+        "error": error,
+        "document_path": "",
+        "mirror_path": "",
+    }
+
+
+def _init_worker():
+    # Each worker is already its own process: render inline, with a warm template
+    from config import Config
+    Config.RENDER_PROCESSES = 0
+    from logic.template_cache import load_template
+    load_template()
+
+
+def process_row(row_number, form_data):
+    """Validate, build and generate one submission. Never raises."""
+    from services.submission_service import SubmissionService
+    result = row_result(row_number, form_data.get("name", ""))
+    try:
+        validation = SubmissionService.validate(form_data)
+        if not validation["success"]:
+            result.update(status="invalid", error=validation["error"])
+            return result
+        context = SubmissionService.build_context(form_data)
+        generated = SubmissionService.generate_documents(form_data, context)
+        result["document_path"] = generated["document_path"] or ""
+        result["mirror_path"] = generated["mirror_path"] or ""
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    return result
+
+
+def run_batch(path, workers, report_path=None, fmt=None):
+    started = time.perf_counter()
+    results = []
+    in_flight = set()
+    max_in_flight = workers * 4
+
+    def record(r):
+        results.append(r)
+        mark = "✅" if r["status"] == "ok" else "❌"
+        detail = r["document_path"] if r["status"] == "ok" else r["error"]
+        print(f"{mark} [{len(results)}] row {r['row']} {r['name']}: {detail}", flush=True)
+
+    def collect(done):
+        for future in done:
+            record(future.result())
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for row_number, form_data, error in read_rows(path, fmt):
+            if error:
+                # Unreadable rows are reported like any other invalid row
+                record(row_result(row_number, status="invalid", error=error))
+                continue
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight.add(pool.submit(process_row, row_number, form_data))
+        done, _ = wait(in_flight)
+        collect(done)
+
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda r: r["row"])
+
+    if report_path:
+        with open(report_path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=["row", "name", "status", "error", "document_path", "mirror_path"])
+            writer.writeheader()
+            writer.writerows(results)
+
+    ok = sum(1 for r in results if r["status"] == "ok")
+    docs = sum(1 for r in results for k in ("document_path", "mirror_path") if r[k])
+    print("")
+    print(f"📊 Rows: {len(results)}  ✅ OK: {ok}  ❌ Failed/invalid: {len(results) - ok}")
+    print(f"📄 Documents: {docs}  ⏱ {elapsed:.1f}s  "
+          f"({len(results) / elapsed if elapsed else 0:.2f} rows/s, {docs / elapsed if elapsed else 0:.2f} docs/s)")
+    if report_path:
+        print(f"📝 Report: {report_path}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate wills for every row of a CSV/JSONL intake file")
+    parser.add_argument("input", help="CSV or JSONL file using the web form's field names")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--report", help="write a per-row CSV report here")
+    args = parser.parse_args(argv)
+
+    results = run_batch(args.input, max(args.workers, 1), args.report, args.format)
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+"""
+Micro-benchmarks for the submission pipeline hot paths.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --save-baseline          # record benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+"""
@@ -0,0 +1,77 @@
+# benchmarks/fixtures.py
+"""
+Deterministic synthetic submissions for the benchmarks.
+The same arguments always produce the same form data.
+"""
+
+POA_SLOTS = ("one", "two", "three", "four")
+
+POA_INCLUDE_FLAGS = {
+    "one": "include_poa",
+    "two": "second_poa",
+    "three": "include_poa_personal_care",
+    "four": "second_poa_personal_care",
+}
+
+
+def make_form(beneficiaries=1, mirror=False, poa=True):
+    """
+    Flat form data as the web form submits it: applicant, spouse as primary
+    executor, `beneficiaries` beneficiaries with shares summing to 100, and
+    (when poa is set) all four POA attorneys filled in.
+    """
+    form = {
+        "name": "John Smith",
+        "gender": "Male",
+        "dob": "1980-02-01",
+        "phone": "4165551234",
+        "email": "john.smith@example.com",
+        "street_number": "12",
+        "street_name": "Main Street",
+        "city": "Toronto",
+        "regional_municipality": "York",
+        "province": "ON",
+        "postal_code": "M1M 1M1",
+        "exec1_name": "Jane Smith",
+        "exec1_relation": "Wife",
+        "exec1_dob": "1982-03-04",
+        "include_second_executor": "true",
+        "exec2_name": "Adam Smith",
+        "exec2_relation": "Brother",
+        "exec2_dob": "1978-07-19",
+        "equal_shares": "false",
+        "mirror_will": "true" if mirror else "false",
+        "mirror_poa": "true" if mirror else "false",
+        "terms_agreement": "true",
+    }
+
+    share = round(100.0 / beneficiaries, 2) if beneficiaries else 0
+    for i in range(1, beneficiaries + 1):
+        last = i == beneficiaries
+        form[f"beneficiary_{i}_name"] = f"Child Number {i}"
+        form[f"beneficiary_{i}_relation"] = "Son" if i % 2 else "Daughter"
+        form[f"beneficiary_{i}_dob"] = f"20{i % 20:02d}-0{1 + i % 9}-1{i % 10}"
+        form[f"beneficiary_{i}_share"] = f"{100 - share * (beneficiaries - 1):.2f}" if last else f"{share:.2f}"
+
+    if poa:
+        for n, slot in enumerate(POA_SLOTS, start=1):
+            form[POA_INCLUDE_FLAGS[slot]] = "true"
+            form[f"poa_name_{slot}"] = "Jane Smith" if slot in ("one", "three") else f"Attorney {n}"
+            form[f"poa_relation_{slot}"] = "Wife" if slot in ("one", "three") else "Friend"
+            form[f"poa_dob_{slot}"] = f"198{n}-0{n}-1{n}"
+            form[f"poa_street_number_{slot}"] = str(10 * n)
+            form[f"poa_street_name_{slot}"] = "King Street"
+            form[f"poa_city_{slot}"] = "Mississauga"
+            form[f"poa_regional_municipality_{slot}"] = "Peel"
+            form[f"poa_province_{slot}"] = "ON"
+            form[f"poa_postal_code_{slot}"] = f"L5B {n}A{n}"
+
+    return form
+
+
+# (label, make_form kwargs) for every fixture the suite runs
+FIXTURES = [
+    (f"b{count}_{'mirror' if mirror else 'single'}", {"beneficiaries": count, "mirror": mirror})
+    for count in (1, 10, 50)
+    for mirror in (False, True)
+]
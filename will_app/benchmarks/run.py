@@ -0,0 +1,202 @@
+# benchmarks/run.py
+"""
+Run the pipeline micro-benchmarks, save the results as JSON and optionally
+compare them with a stored baseline.
+
+Everything runs inside a throwaway working directory with its own SQLite
+store, so generated wills and seeded submissions never touch real data.
+Exits non-zero when any benchmark's median is slower than the baseline by
+more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from copy import deepcopy
+from datetime import datetime
+
+from benchmarks.fixtures import FIXTURES, make_form
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Iterations per benchmark family, before --repeat-scale
+REPEATS = {
+    "process_beneficiaries_data": 200,
+    "convert_all_to_uppercase": 200,
+    "normalize_dates": 200,
+    "generate_word_document": 5,
+    "generate_mirror_will": 5,
+    "log_to_excel": 20,
+}
+
+EXISTING_ROW_COUNTS = (1_000, 10_000, 50_000)
+
+
+def measure(fn, setup=None, repeat=10, warmup=1):
+    """
+    Time fn(setup()) `repeat` times; setup runs outside the timed region.
+    Returns summary statistics in milliseconds.
+    """
+    for _ in range(warmup):
+        fn(setup() if setup else None)
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
+
+
+def _seed_submissions(form, target):
+    """Top the submissions table up to `target` rows with copies of one form"""
+    from contextlib import closing
+    from logic.submission_store import connect, _now
+    with closing(connect()) as conn, conn:
+        existing = conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+        data = json.dumps(form)
+        conn.executemany(
+            "INSERT INTO submissions (created_at, name, mirror_will, document_path, data) VALUES (?, ?, 0, NULL, ?)",
+            ((_now(), form["name"], data) for _ in range(max(target - existing, 0))),
+        )
+
+
+def _benchmarks():
+    """
+    Yield (name, family, fn, setup, prepare) for every benchmark in the suite.
+    prepare, when given, runs once before the benchmark is timed.
+    """
+    from logic.beneficiaries import process_beneficiaries_data
+    from logic.document import convert_all_to_uppercase, normalize_dates, generate_word_document, generate_mirror_will
+    from logic.excel_logger import log_to_excel
+    from services.submission_service import SubmissionService
+
+    for label, kwargs in FIXTURES:
+        form = make_form(**kwargs)
+        context = SubmissionService.build_context(form)
+        upper = convert_all_to_uppercase(context)
+
+        yield f"process_beneficiaries_data[{label}]", "process_beneficiaries_data", \
+            lambda _, form=form: process_beneficiaries_data(form), None, None
+        yield f"convert_all_to_uppercase[{label}]", "convert_all_to_uppercase", \
+            lambda _, context=context: convert_all_to_uppercase(context), None, None
+        yield f"normalize_dates[{label}]", "normalize_dates", \
+            normalize_dates, lambda upper=upper: dict(upper), None
+        # An explicit output path always renders (no reuse of identical documents)
+        output_path = os.path.join("generated_wills", f"bench_{label}.docx")
+        if kwargs["mirror"]:
+            yield f"generate_mirror_will[{label}]", "generate_mirror_will", \
+                lambda ctx, output_path=output_path: generate_mirror_will(ctx, output_path=output_path), \
+                lambda context=context: deepcopy(context), None
+        else:
+            yield f"generate_word_document[{label}]", "generate_word_document", \
+                lambda ctx, output_path=output_path: generate_word_document(ctx, output_path=output_path), \
+                lambda context=context: deepcopy(context), None
+
+    form = make_form(beneficiaries=10)
+    for rows in EXISTING_ROW_COUNTS:
+        yield f"log_to_excel[{rows}_rows]", "log_to_excel", \
+            lambda _, form=form: log_to_excel(form), None, lambda form=form, rows=rows: _seed_submissions(form, rows)
+
+
+def run_suite(name_filter=None, repeat_scale=1.0):
+    """Run every benchmark (optionally only names containing name_filter) and return the results document"""
+    from config import Config
+    from logic.template_cache import load_template, template_version
+
+    results = {}
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="will_bench_") as workdir:
+        os.chdir(workdir)
+        Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        try:
+            load_template()
+            for name, family, fn, setup, prepare in _benchmarks():
+                if name_filter and name_filter not in name:
+                    continue
+                if prepare:
+                    prepare()
+                repeat = max(1, int(REPEATS[family] * repeat_scale))
+                results[name] = measure(fn, setup, repeat)
+                print(f"⏱ {name:<48} median {results[name]['median_ms']:>10.3f} ms  "
+                      f"p95 {results[name]['p95_ms']:>10.3f} ms", flush=True)
+        finally:
+            os.chdir(original_cwd)
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "template_version": template_version(),
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print median changes against the baseline; return the names that regressed"""
+    regressions = []
+    print("")
+    print(f"{'benchmark':<50} {'baseline':>11} {'current':>11} {'change':>9}")
+    for name, result in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if not base:
+            print(f"{name:<50} {'-':>11} {result['median_ms']:>9.3f}ms {'new':>9}")
+            continue
+        change = (result["median_ms"] - base["median_ms"]) / base["median_ms"] if base["median_ms"] else 0.0
+        mark = ""
+        if change > threshold:
+            regressions.append(name)
+            mark = " ⚠️"
+        print(f"{name:<50} {base['median_ms']:>9.3f}ms {result['median_ms']:>9.3f}ms {change:>+8.1%}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the will submission pipeline")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed median slowdown (default 0.20 = 20%%)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat-scale", type=float, default=1.0, help="multiply every iteration count")
+    args = parser.parse_args(argv)
+
+    # Resolve paths before the suite changes into its scratch directory
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    current = run_suite(args.filter, args.repeat_scale)
+
+    for path in filter(None, (output, DEFAULT_BASELINE if args.save_baseline else None)):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(current, fh, indent=2)
+        print(f"📝 Results: {path}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
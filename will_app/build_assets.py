@@ -0,0 +1,35 @@
+"""
+Build fingerprinted, gzip-precompressed copies of static/css and static/js.
+
+Run it as part of a deploy, before starting the server; the app also rebuilds
+on start-up when it finds the build missing or older than the sources.
+Output goes to Config.ASSET_BUILD_FOLDER (static/build/ by default).
+
+    python build_assets.py
+"""
+import argparse
+import os
+import sys
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets")
+    parser.add_argument("--source", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"),
+                        help="static folder to read (default: static/ next to this script)")
+    parser.add_argument("--target", help="output folder (default: Config.ASSET_BUILD_FOLDER)")
+    args = parser.parse_args(argv)
+
+    from logic.static_assets import build_assets
+
+    started = time.perf_counter()
+    manifest = build_assets(args.source, args.target)
+    elapsed = time.perf_counter() - started
+    for filename, built in sorted(manifest.items()):
+        print(f"   {filename} -> {built}")
+    print(f"📦 Built {len(manifest)} assets  ⏱ {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import os
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-change-in-production'
+    DEBUG = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///will_app.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
@@ -11,6 +12,60 @@ class Config:
     EXCEL_FOLDER = os.path.join(BASE_DIR, 'storage/excel_logs')
     TEMPLATE_FOLDER = os.path.join(BASE_DIR, 'storage/templates')
     
+    # Generated documents (relative to the working directory), sharded by day as YYYY/MM/DD/
+    DOCUMENTS_FOLDER = os.environ.get('DOCUMENTS_FOLDER', 'generated_wills')
+    # Storage maintenance (maintain_storage.py): delete documents older than DOCUMENT_RETENTION_DAYS
+    # (0 = keep forever), pack months older than ARCHIVE_AFTER_MONTHS into monthly ZIPs (0 = never),
+    # remove temporary files older than TEMP_FILE_MAX_AGE seconds
+    DOCUMENT_RETENTION_DAYS = int(os.environ.get('DOCUMENT_RETENTION_DAYS', 0))
+    ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', 3))
+    TEMP_FILE_MAX_AGE = int(os.environ.get('TEMP_FILE_MAX_AGE', 60 * 60))
+    
+    # Submission log writer (logic.submission_log): rows are committed in groups of up to
+    # LOG_BATCH_SIZE; a group also waits up to LOG_COMMIT_INTERVAL_MS to fill (0 = commit
+    # whatever queued up while the previous commit ran)
+    LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE', 64))
+    LOG_COMMIT_INTERVAL_MS = int(os.environ.get('LOG_COMMIT_INTERVAL_MS', 0))
+    
+    # Background document generation
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_QUEUE_LIMIT = int(os.environ.get('JOB_QUEUE_LIMIT', 100))
+    JOB_SHUTDOWN_TIMEOUT = int(os.environ.get('JOB_SHUTDOWN_TIMEOUT', 30))
+    
+    # Worker processes for rendering a will and its mirror concurrently (0 = render inline)
+    RENDER_PROCESSES = int(os.environ.get('RENDER_PROCESSES', 2 if (os.cpu_count() or 1) > 1 else 0))
+    
+    # Server-side sessions: 'sqlite', 'filesystem' or 'cookie' (Flask default)
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'sqlite')
+    SESSION_FILE_DIR = os.path.join(BASE_DIR, 'storage/sessions')
+    SESSION_IDLE_TIMEOUT = int(os.environ.get('SESSION_IDLE_TIMEOUT', 24 * 60 * 60))
+    
+    # Idempotent final submissions: a repeat waits up to IDEMPOTENCY_WAIT seconds for the
+    # first request; a key pending longer than IDEMPOTENCY_STALE is retried; keys kept for IDEMPOTENCY_TTL
+    IDEMPOTENCY_WAIT = int(os.environ.get('IDEMPOTENCY_WAIT', 30))
+    IDEMPOTENCY_STALE = int(os.environ.get('IDEMPOTENCY_STALE', 10 * 60))
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 60 * 60))
+    
+    # Partner API (/api): comma-separated keys sent as X-API-Key; no keys = API disabled
+    API_KEYS = frozenset(k.strip() for k in os.environ.get('API_KEYS', '').split(',') if k.strip())
+    API_BULK_LIMIT = int(os.environ.get('API_BULK_LIMIT', 500))
+    
+    # Production serving (gunicorn.conf.py): worker processes, threads per worker, request
+    # timeout and graceful-shutdown timeout in seconds
+    WEB_BIND = os.environ.get('WEB_BIND', '0.0.0.0:8000')
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS', min(2 * (os.cpu_count() or 1) + 1, 8)))
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 120))
+    WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+    WEB_KEEPALIVE = int(os.environ.get('WEB_KEEPALIVE', 5))
+    # Render a dummy will at start-up so the first request is not a cold start
+    WARMUP = os.environ.get('WARMUP', '1').lower() not in ('0', 'false', 'no')
+    
+    # Fingerprinted, gzipped copies of static/css and static/js (build_assets.py), served
+    # from /assets/ with an immutable Cache-Control of ASSET_MAX_AGE seconds
+    ASSET_BUILD_FOLDER = os.environ.get('ASSET_BUILD_FOLDER', os.path.join(BASE_DIR, 'static/build'))
+    ASSET_MAX_AGE = int(os.environ.get('ASSET_MAX_AGE', 365 * 24 * 60 * 60))
+    
     @staticmethod
     def ensure_directories():
         directories = [
@@ -21,4 +76,10 @@ class Config:
         for directory in directories:
             os.makedirs(directory, exist_ok=True)
 
+
+class DevelopmentConfig(Config):
+    """python app.py: Flask's debug server with the reloader"""
+    DEBUG = True
+
+
 Config.ensure_directories()
\ No newline at end of file
@@ -0,0 +1,37 @@
+# gunicorn.conf.py
+"""
+Production server settings: gunicorn -c gunicorn.conf.py (from will_app/).
+
+Sizes and timeouts come from config.Config (WEB_WORKERS, WEB_THREADS,
+WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_KEEPALIVE, WEB_BIND), i.e. from the
+environment. The app is preloaded and warmed in the master (see wsgi.py).
+"""
+from config import Config
+
+wsgi_app = "wsgi:app"
+bind = Config.WEB_BIND
+workers = Config.WEB_WORKERS
+# Threaded workers: a render blocks its thread, not the whole worker
+worker_class = "gthread"
+threads = Config.WEB_THREADS
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_GRACEFUL_TIMEOUT
+keepalive = Config.WEB_KEEPALIVE
+preload_app = True
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # Job threads and the render pool are per process and must start after the fork
+    from app import start_background_services
+    start_background_services()
+
+
+def worker_exit(server, worker):
+    # Drain queued jobs, then the submission log, then stop the render workers
+    from services.job_service import JobService
+    from logic import submission_log
+    from logic.render_pool import shutdown_render_pool
+    JobService.shutdown()
+    submission_log.shutdown()
+    shutdown_render_pool()
@@ -0,0 +1,41 @@
+# helpers/indexed_fields.py
+"""
+Single-pass grouping of the form's repeated fields.
+
+Beneficiaries arrive as beneficiary_<n>_<field> (older clients sent
+beneficiary_<field>_<n>) and attorneys as poa_<field>_<slot>. Instead of
+probing every possible slot number, parse_indexed_fields() walks the submitted
+keys once, so the cost follows what was actually sent and there is no upper
+limit on the number of beneficiaries.
+"""
+
+BENEFICIARY_FIELDS = ("name", "relation", "dob", "share")
+POA_SLOTS = ("one", "two", "three", "four")
+
+_BENEFICIARY_PREFIX = "beneficiary_"
+_POA_PREFIX = "poa_"
+
+
+def parse_indexed_fields(form_data):
+    """
+    Returns {"beneficiaries": {n: {field: value}}, "attorneys": {slot: {field: value}}}
+    with beneficiaries ordered by n. beneficiary_<n>_<field> wins over the
+    older beneficiary_<field>_<n> spelling when both are present.
+    """
+    beneficiaries = {}
+    attorneys = {}
+    for key, value in form_data.items():
+        if key.startswith(_BENEFICIARY_PREFIX):
+            head, _, tail = key[len(_BENEFICIARY_PREFIX):].partition("_")
+            if head.isdigit() and tail in BENEFICIARY_FIELDS:
+                beneficiaries.setdefault(int(head), {})[tail] = value
+            elif tail.isdigit() and head in BENEFICIARY_FIELDS:
+                beneficiaries.setdefault(int(tail), {}).setdefault(head, value)
+        elif key.startswith(_POA_PREFIX):
+            field, _, slot = key[len(_POA_PREFIX):].rpartition("_")
+            if field and slot in POA_SLOTS:
+                attorneys.setdefault(slot, {})[field] = value
+    return {
+        "beneficiaries": dict(sorted(beneficiaries.items())),
+        "attorneys": attorneys,
+    }
@@ -0,0 +1,214 @@
+# helpers/validation_schema.py
+"""
+Declarative validation rules for the five form steps.
+
+STEP_RULES is plain data: it is compiled once, at import, into one validator
+per step that reports every error in a single pass, and the same structure is
+handed to the browser (browser_schema()) where static/js/validation.js runs it
+before a step is posted.
+
+Rule types ("when"/"unless" name a checkbox flag that switches a rule on/off):
+    required      every field in "fields" must be filled in
+    contains      "field", if filled in, must contain "value"
+    min_length    "field", if filled in, must be at least "value" characters
+                  long once the characters in "ignore" are removed
+    pattern       "field", if filled in, must match the regex "pattern"
+    contains_any  "field", if filled in, must contain one of "values" (any case)
+    group_any     at least one record of "group" has all of "fields" filled in
+    group_total   over records of "group" with all of "fields" filled in,
+                  "field" must be numeric and add up to "total" +/- "tolerance"
+"""
+import re
+
+from helpers.indexed_fields import parse_indexed_fields
+
+# Checkbox values that count as ticked (same as helpers.formatters.safe_bool)
+FLAG_VALUES = [True, "True", "true", "1", 1, "yes", "Yes", "on", "On"]
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+ADDRESS_FIELDS = ["street_number", "street_name", "city", "regional_municipality", "province", "postal_code"]
+
+POA_ADDRESS_FIELDS = ["street_number", "street_name", "city", "province", "postal_code"]
+
+
+def _poa_rules(slot, flag, label):
+    return [
+        {"type": "required", "when": flag, "fields": [f"poa_name_{slot}", f"poa_relation_{slot}"],
+         "message": f"{label} attorney name and relation are required"},
+        {"type": "required", "when": flag, "fields": [f"poa_dob_{slot}"],
+         "message": f"{label} attorney date of birth is required"},
+        *({"type": "required", "when": flag, "fields": [f"poa_{name}_{slot}"],
+           "message": f"{label} attorney {name.replace('_', ' ')} is required"} for name in POA_ADDRESS_FIELDS),
+        {"type": "pattern", "field": f"poa_dob_{slot}", "pattern": DATE_PATTERN,
+         "message": f"Invalid date format for poa_dob_{slot}"},
+    ]
+
+
+STEP_RULES = {
+    # Personal Information
+    1: [
+        *({"type": "required", "fields": [name], "message": f"Missing required field: {name}"}
+          for name in ("name", "gender", "dob", "phone", "email")),
+        *({"type": "required", "fields": [name], "message": f"Missing required address field: {name}"}
+          for name in ADDRESS_FIELDS),
+        {"type": "pattern", "field": "dob", "pattern": DATE_PATTERN, "message": "Invalid date format for dob"},
+        {"type": "contains", "field": "email", "value": "@", "message": "Invalid email format"},
+        {"type": "min_length", "field": "phone", "value": 10, "ignore": "-",
+         "message": "Phone number must be at least 10 digits"},
+        {"type": "min_length", "field": "postal_code", "value": 6, "ignore": " ",
+         "message": "Postal code must be at least 6 characters"},
+    ],
+    # Executors
+    2: [
+        {"type": "required", "fields": ["exec1_name", "exec1_relation"],
+         "message": "First executor name and relation are required"},
+        {"type": "required", "fields": ["exec1_dob"], "message": "First executor date of birth is required"},
+        {"type": "required", "when": "include_second_executor", "fields": ["exec2_name", "exec2_relation"],
+         "message": "Second executor name and relation are required when included"},
+        {"type": "required", "when": "include_second_executor", "fields": ["exec2_dob"],
+         "message": "Second executor date of birth is required when included"},
+        {"type": "pattern", "field": "exec1_dob", "pattern": DATE_PATTERN,
+         "message": "Invalid date format for exec1_dob"},
+        {"type": "pattern", "field": "exec2_dob", "pattern": DATE_PATTERN,
+         "message": "Invalid date format for exec2_dob"},
+    ],
+    # Beneficiaries
+    3: [
+        {"type": "group_any", "group": "beneficiaries", "fields": ["name", "relation"],
+         "message": "At least one beneficiary is required"},
+        {"type": "group_total", "group": "beneficiaries", "unless": "equal_shares", "fields": ["name", "relation"],
+         "field": "share", "total": 100, "tolerance": 0.01,
+         "invalid_message": "Beneficiary {n}: invalid share value",
+         "message": "Beneficiary shares must total 100% (currently {total}%)"},
+    ],
+    # Power of Attorney
+    4: [
+        *_poa_rules("one", "include_poa", "General POA"),
+        *_poa_rules("three", "include_poa_personal_care", "Personal care POA"),
+    ],
+    # Review
+    5: [
+        {"type": "required", "fields": ["terms_agreement"], "message": "You must accept the terms and conditions"},
+        {"type": "contains_any", "when": "mirror_will", "field": "exec1_relation",
+         "values": ["wife", "husband", "spouse"],
+         "message": "Mirror will requires spouse to be primary executor"},
+    ],
+}
+
+# Steps whose rules a complete submission must pass (review/terms is interactive only)
+SUBMISSION_STEPS = (1, 2, 3, 4)
+
+
+# ============================================================
+# Compilation
+# ============================================================
+def _is_flag(value):
+    return value in FLAG_VALUES
+
+
+def _compile_rule(rule):
+    """Turn one rule into check(data, groups) -> list of error messages"""
+    kind = rule["type"]
+    message = rule["message"]
+
+    if kind == "required":
+        fields = tuple(rule["fields"])
+        check = lambda data, groups: [message] if not all(data.get(f) for f in fields) else []
+
+    elif kind == "contains":
+        field, value = rule["field"], rule["value"]
+        check = lambda data, groups: [message] if data.get(field) and value not in str(data[field]) else []
+
+    elif kind == "min_length":
+        field, minimum = rule["field"], rule["value"]
+        strip = str.maketrans("", "", rule.get("ignore", ""))
+        check = lambda data, groups: (
+            [message] if data.get(field) and len(str(data[field]).translate(strip)) < minimum else [])
+
+    elif kind == "pattern":
+        field, regex = rule["field"], re.compile(rule["pattern"])
+        check = lambda data, groups: [message] if data.get(field) and not regex.match(str(data[field])) else []
+
+    elif kind == "contains_any":
+        field, values = rule["field"], tuple(v.lower() for v in rule["values"])
+        check = lambda data, groups: (
+            [message] if data.get(field) and not any(v in str(data[field]).lower() for v in values) else [])
+
+    elif kind == "group_any":
+        group, fields = rule["group"], tuple(rule["fields"])
+        check = lambda data, groups: (
+            [] if any(all(r.get(f) for f in fields) for r in groups[group].values()) else [message])
+
+    elif kind == "group_total":
+        group, fields, field = rule["group"], tuple(rule["fields"]), rule["field"]
+        total, tolerance, invalid = rule["total"], rule["tolerance"], rule["invalid_message"]
+
+        def check(data, groups):
+            errors, running = [], 0.0
+            for n, record in groups[group].items():
+                if all(record.get(f) for f in fields):
+                    raw = record.get(field)
+                    try:
+                        running += float(raw) if raw else 0.0
+                    except (TypeError, ValueError):
+                        errors.append(invalid.format(n=n))
+            if not errors and abs(running - total) > tolerance:
+                errors.append(message.format(total=f"{running:.2f}"))
+            return errors
+
+    else:
+        raise ValueError(f"Unknown validation rule type: {kind}")
+
+    when, unless = rule.get("when"), rule.get("unless")
+    if when or unless:
+        inner = check
+        check = lambda data, groups: (
+            inner(data, groups)
+            if (not when or _is_flag(data.get(when))) and not (unless and _is_flag(data.get(unless)))
+            else [])
+    return check
+
+
+def compile_rules(rules):
+    """Compile a list of rules into validate(data, groups=None) -> list of every error"""
+    checks = [_compile_rule(rule) for rule in rules]
+    needs_groups = any("group" in rule for rule in rules)
+
+    def validate(data, groups=None):
+        if needs_groups and groups is None:
+            groups = parse_indexed_fields(data)
+        errors = []
+        for check in checks:
+            errors.extend(check(data, groups))
+        return errors
+
+    return validate
+
+
+STEP_VALIDATORS = {step: compile_rules(rules) for step, rules in STEP_RULES.items()}
+
+
+def validate_step(step_number, data):
+    """Every error for one step's data (an empty list when it is valid)"""
+    validator = STEP_VALIDATORS.get(step_number)
+    if validator is None:
+        return ["Invalid step number"]
+    return validator(data)
+
+
+def validate_submission(data):
+    """Every error for a complete submission (all data steps, one parse of the repeated fields)"""
+    groups = parse_indexed_fields(data)
+    errors = []
+    for step in SUBMISSION_STEPS:
+        errors.extend(STEP_VALIDATORS[step](data, groups))
+    return errors
+
+
+_BROWSER_SCHEMA = {"flag_values": FLAG_VALUES, "steps": {str(step): rules for step, rules in STEP_RULES.items()}}
+
+
+def browser_schema():
+    """The rules as JSON-ready data for static/js/validation.js"""
+    return _BROWSER_SCHEMA
@@ -1,32 +1,30 @@
 # logic/beneficiaries.py
-from helpers.formatters import format_date, title_case, safe_bool, safe_float
-
-MAX_BENEFICIARIES = 50  # future-proof; UI caps at 10
+from helpers.formatters import format_date, title_case, safe_float
+from logic.models import Will
 
 def process_beneficiaries_data(form_data: dict) -> dict:
     """
     Normalizes all beneficiary inputs and prepares context
     expected by the Word template.
     """
-    beneficiaries = []
+    return beneficiaries_context(Will.from_form(form_data))
 
-    # --- Collect all ---
-    for i in range(1, MAX_BENEFICIARIES + 1):
-        name = form_data.get(f"beneficiary_{i}_name")
-        relation = form_data.get(f"beneficiary_{i}_relation")
-        dob = form_data.get(f"beneficiary_{i}_dob")
-        share_raw = form_data.get(f"beneficiary_{i}_share")
+def beneficiaries_context(will) -> dict:
+    """Beneficiary list, has_beneficiaries and equal_shares for the template"""
+    beneficiaries = []
 
-        if name and relation and dob:
+    # --- Collect complete entries ---
+    for b in will.beneficiaries:
+        if b.name and b.relation and b.dob:
             beneficiaries.append({
-                "relation": title_case(relation or ""),
-                "name": title_case(name or ""),
-                "dob": format_date(dob or ""),
-                "share": safe_float(share_raw, 0.0)
+                "relation": title_case(b.relation),
+                "name": title_case(b.name),
+                "dob": format_date(b.dob),
+                "share": safe_float(b.share, 0.0)
             })
 
     has_beneficiaries = len(beneficiaries) > 0
-    equal = safe_bool(form_data.get("equal_shares"))
+    equal = will.equal_shares
 
     # --- Equal share logic ---
     if equal and has_beneficiaries:
@@ -1,8 +1,15 @@
+import hashlib
+import json
 import logging
 import os
 import datetime
+import threading
+import time
 from copy import deepcopy
-from docxtpl import DocxTemplate
+from logic.template_cache import load_template, template_version
+from logic.submission_store import record_document, find_document_by_hash
+from logic.document_storage import shard_path
+from logic.metrics import stage_timer, observe_stage
 
 logger = logging.getLogger(__name__)
 
@@ -58,27 +65,50 @@ def convert_all_to_uppercase(data_dict):
             result[key] = value
     return result
 
-def generate_word_document(context, is_mirror=False):
-    """Generate the will Word document with docxtpl - NOW WITH UPPERCASE"""
+def normalize_dates(context):
+    """Rewrite date values (date objects or "01 Oct 2025" strings) as YYYY-MM-DD, in place"""
+    for key, value in list(context.items()):
+        # Convert date objects
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            context[key] = value.strftime("%Y-%m-%d")
+        # Convert strings like "01 Oct 2025"
+        elif isinstance(value, str):
+            try:
+                parsed = datetime.datetime.strptime(value, "%d %b %Y")
+                context[key] = parsed.strftime("%Y-%m-%d")
+            except Exception:
+                pass
+    return context
+
+def content_hash(context):
+    """Hash of a fully prepared render context and the template it is rendered into"""
+    payload = json.dumps({"template": template_version(), "context": context},
+                         sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generate_word_document(context, is_mirror=False, output_path=None, record=True):
+    """
+    Generate the will Word document with docxtpl - NOW WITH UPPERCASE
+    Documents are content-addressed: when a document was already rendered from
+    an identical context it is returned instead of rendering again.
+    output_path overrides the generated generated_wills/YYYY/MM/DD/ path (used by re-renders).
+    record=False leaves the document out of the index (warm-up renders).
+    """
     try:
         logger.info("Starting Word document generation...")
+        kind = "mirror" if is_mirror or context.get("is_mirror") else "will"
 
-        # --- locate template ---
-        template_name = "universal_will_template.docx"
-        possible_paths = [
-            template_name,
-            f"templates/{template_name}",
-            os.path.join(os.path.dirname(__file__), f"../{template_name}"),
-            os.path.join(os.path.dirname(__file__), f"../templates/{template_name}")
-        ]
-        template_path = next((p for p in possible_paths if os.path.exists(p)), None)
-        if not template_path:
-            raise FileNotFoundError(f"Template file not found. Checked: {possible_paths}")
+        # --- load template (parsed once, cached per process) ---
+        with stage_timer(f"{kind}.template_load"):
+            doc = load_template()
 
         # ------------------------------------------------------------
         # UPDATED: CONVERT EVERYTHING TO UPPERCASE FIRST
         # ------------------------------------------------------------
-        context = convert_all_to_uppercase(context)
+        with stage_timer(f"{kind}.uppercase"):
+            context = convert_all_to_uppercase(context)
+        prepare_started = time.perf_counter()
 
         # ------------------------------------------------------------
         # UPDATED: ADDRESS HANDLING (now EXCLUDES regional_municipality)
@@ -97,17 +127,7 @@ def generate_word_document(context, is_mirror=False):
         # ------------------------------------------------------------
         # DATE NORMALIZATION
         # ------------------------------------------------------------
-        for key, value in list(context.items()):
-            # Convert date objects
-            if isinstance(value, (datetime.date, datetime.datetime)):
-                context[key] = value.strftime("%Y-%m-%d")
-            # Convert strings like "01 Oct 2025"
-            elif isinstance(value, str):
-                try:
-                    parsed = datetime.datetime.strptime(value, "%d %b %Y")
-                    context[key] = parsed.strftime("%Y-%m-%d")
-                except Exception:
-                    pass
+        normalize_dates(context)
 
         # ------------------------------------------------------------
         # FIXED: BENEFICIARIES - REMOVED THE CODE THAT WAS OVERWRITING DATA
@@ -128,22 +148,38 @@ def generate_word_document(context, is_mirror=False):
 
         if context["equal_shares"] and context["beneficiaries"]:
             context["equal_share_percentage"] = f"{100.0 / len(context['beneficiaries']):.2f}"
+        digest = content_hash(context)
+        observe_stage(f"{kind}.prepare", time.perf_counter() - prepare_started)
 
+        raw_name = context.get("name", "Unknown")
+        prefix = "Mirror_" if is_mirror or context.get("is_mirror") else ""
+        if not output_path:
+            # Identical content (a resubmission) reuses the document already on disk
+            existing = find_document_by_hash(digest)
+            if existing:
+                logger.info(f"♻️ Reusing identical document: {existing}")
+                return existing
+            # The content hash keeps names unique when the same name is submitted within a second
+            now = datetime.datetime.now()
+            safe_name = "".join(c for c in raw_name if c.isalnum() or c in (" ", "-", "_")).strip()
+            filename = f"{prefix}Will_{safe_name or 'Unknown'}_{now:%Y%m%d_%H%M%S}_{digest[:12]}.docx"
+            output_path = shard_path(filename, now)
 
         # ------------------------------------------------------------
         # Render and save
         # ------------------------------------------------------------
-        doc = DocxTemplate(template_path)
-        doc.render(context)
+        with stage_timer(f"{kind}.render"):
+            doc.render(context)
 
-        os.makedirs("generated_wills", exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        raw_name = context.get("name", "Unknown")
-        safe_name = "".join(c for c in raw_name if c.isalnum() or c in (" ", "-", "_")).strip()
-        prefix = "Mirror_" if is_mirror or context.get("is_mirror") else ""
-        filename = f"{prefix}Will_{safe_name or 'Unknown'}_{timestamp}.docx"
-        output_path = os.path.join("generated_wills", filename)
-        doc.save(output_path)
+        with stage_timer(f"{kind}.save"):
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            # Write aside and rename, so a concurrent render never leaves a half-written file
+            tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            doc.save(tmp_path)
+            os.replace(tmp_path, output_path)
+        if record:
+            with stage_timer(f"{kind}.record"):
+                record_document(output_path, raw_name, is_mirror=bool(prefix), content_hash=digest)
 
         logger.info(f"✅ Document saved successfully: {output_path}")
         return output_path
@@ -153,12 +189,13 @@ def generate_word_document(context, is_mirror=False):
         raise Exception(f"Document generation failed: {str(e)}") from e
 
 
-def generate_mirror_will(original_context):
+def generate_mirror_will(original_context, output_path=None):
     """
     UPDATED: Create a PROPER 'mirror' will by COMPLETELY flipping applicant <-> spouse
     This now works EXACTLY like your old desktop app
     """
     try:
+        swap_started = time.perf_counter()
         ctx = deepcopy(original_context)
         
         # Check if we can create a mirror will (spouse must be executor)
@@ -302,9 +339,10 @@ def generate_mirror_will(original_context):
         # CONVERT EVERYTHING TO UPPERCASE BEFORE GENERATING
         # ------------------------------------------------------------
         ctx = convert_all_to_uppercase(ctx)
+        observe_stage("mirror.swap", time.perf_counter() - swap_started)
 
         # --- generate mirrored document ---
-        return generate_word_document(ctx, is_mirror=True)
+        return generate_word_document(ctx, is_mirror=True, output_path=output_path)
 
     except Exception as e:
         logger.error(f"Mirror document generation failed: {str(e)}", exc_info=True)
@@ -0,0 +1,278 @@
+# logic/document_storage.py
+"""
+Layout, retention and archival of generated documents.
+
+New documents are written to Config.DOCUMENTS_FOLDER/YYYY/MM/DD/, so no
+directory grows without bound. run_maintenance() (see maintain_storage.py)
+moves documents left in the old flat layout into their day's shard, packs
+months older than Config.ARCHIVE_AFTER_MONTHS into one ZIP per month under
+archive/YYYY-MM.zip, deletes documents past Config.DOCUMENT_RETENTION_DAYS and
+removes stale temporary files. The document index records where each file
+lives, and find_stored_document() opens it from disk or from its archive, so
+the library and download routes work the same for both.
+
+Every rewrite of an archive, together with the index update that goes with
+it, holds an exclusive lock on <archive>.lock, so a deletion from the admin
+portal and a maintenance run packing the same month apply one after the other
+instead of one swapping in an archive built without the other's change.
+"""
+import glob
+import logging
+import os
+import shutil
+import time
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from config import Config
+from logic.submission_store import (
+    find_document, forget_documents, iter_document_locations, set_document_locations,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "archive"
+
+# Leftovers of interrupted writes and of exports written to disk by older releases
+TEMP_PATTERNS = (
+    os.path.join(Config.DOCUMENTS_FOLDER, "**", "*.tmp"),
+    "will_export_*.xlsx",
+    "will_export_*.csv",
+    "will_export_*.jsonl",
+)
+
+
+def shard_path(filename, when=None):
+    """Where a document created at `when` (default: now) is stored"""
+    when = when or datetime.now()
+    return os.path.join(Config.DOCUMENTS_FOLDER, when.strftime("%Y"), when.strftime("%m"), when.strftime("%d"),
+                        filename)
+
+
+def archive_path(month):
+    """Monthly archive for 'YYYY-MM'"""
+    return os.path.join(Config.DOCUMENTS_FOLDER, ARCHIVE_DIR, f"{month}.zip")
+
+
+@dataclass(slots=True)
+class StoredDocument:
+    """A generated document, either a file on disk or a member of a monthly archive"""
+    filename: str
+    path: str
+    archive: str = None
+
+    def open(self):
+        """Binary file object for the document's bytes"""
+        if not self.archive:
+            return open(self.path, "rb")
+        with zipfile.ZipFile(self.archive) as zf:
+            # The member keeps the archive file open after the ZipFile is closed
+            return zf.open(self.filename)
+
+    def zip_info(self, arcname):
+        """ZipInfo (name, timestamp, size) for copying the document into another ZIP"""
+        if not self.archive:
+            return zipfile.ZipInfo.from_file(self.path, arcname)
+        with zipfile.ZipFile(self.archive) as zf:
+            member = zf.getinfo(self.filename)
+        info = zipfile.ZipInfo(arcname, member.date_time)
+        info.file_size = member.file_size
+        return info
+
+
+def find_stored_document(filename):
+    """Locate a document by file name (index first, then the old flat layout); None if it is gone"""
+    if not filename or os.path.basename(filename) != filename:
+        return None
+    row = find_document(filename)
+    if row and row["archive"]:
+        if os.path.isfile(row["archive"]):
+            return StoredDocument(filename, row["path"], row["archive"])
+    elif row and os.path.isfile(row["path"]):
+        return StoredDocument(filename, row["path"])
+    flat = os.path.join(Config.DOCUMENTS_FOLDER, filename)
+    if os.path.isfile(flat):
+        return StoredDocument(filename, flat)
+    return None
+
+
+def delete_documents(filenames):
+    """Delete documents wherever they are stored and drop them from the index. Returns the names removed."""
+    removed, by_archive = [], {}
+    for filename in filenames:
+        doc = find_stored_document(filename)
+        if doc is None:
+            continue
+        if not doc.archive:
+            try:
+                os.remove(doc.path)
+            except FileNotFoundError:
+                # Packed into its archive since it was looked up
+                doc = find_stored_document(filename)
+                if doc is None or not doc.archive:
+                    continue
+            else:
+                _prune_empty_dirs(os.path.dirname(doc.path))
+                removed.append(filename)
+                continue
+        by_archive.setdefault(doc.archive, set()).add(filename)
+    forget_documents(removed)
+    for archive, names in by_archive.items():
+        with _archive_lock(archive):
+            _rewrite_archive(archive, drop=names)
+            forget_documents(sorted(names))
+        removed.extend(sorted(names))
+    return removed
+
+
+# ============================================================
+# Maintenance
+# ============================================================
+def shard_flat_documents():
+    """Move indexed documents still in the flat top-level folder into their day's shard"""
+    root = os.path.normpath(Config.DOCUMENTS_FOLDER)
+    moves = []
+    for doc in iter_document_locations(loose_only=True):
+        if os.path.normpath(os.path.dirname(doc["path"])) != root or not os.path.isfile(doc["path"]):
+            continue
+        target = shard_path(doc["filename"], datetime.strptime(doc["created_at"], "%Y-%m-%d %H:%M:%S"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(doc["path"], target)
+        moves.append((doc["filename"], target, None))
+    if moves:
+        set_document_locations(moves)
+    return len(moves)
+
+
+def archive_months(before):
+    """Pack loose documents created before `before` ('YYYY-MM-DD') into their month's archive"""
+    months = {}
+    for doc in iter_document_locations(before=before, loose_only=True):
+        if os.path.isfile(doc["path"]):
+            months.setdefault(doc["created_at"][:7], []).append(doc)
+
+    archived = 0
+    for month, docs in months.items():
+        archive = archive_path(month)
+        with _archive_lock(archive):
+            _rewrite_archive(archive, add=[(d["filename"], d["path"]) for d in docs])
+            # The index points at the archive before the loose copies go away
+            set_document_locations([(d["filename"], d["path"], archive) for d in docs])
+        for d in docs:
+            os.remove(d["path"])
+            _prune_empty_dirs(os.path.dirname(d["path"]))
+        archived += len(docs)
+        logger.info(f"🗜 Archived {len(docs)} document(s) into {archive}")
+    return archived
+
+
+def apply_retention(before):
+    """Delete every document (loose or archived) created before `before` ('YYYY-MM-DD')"""
+    expired = [doc["filename"] for doc in iter_document_locations(before=before)]
+    removed = delete_documents(expired)
+    # Index rows whose file had already gone are dropped as well
+    forget_documents(sorted(set(expired) - set(removed)))
+    return len(removed)
+
+
+def collect_temp_files(max_age):
+    """Remove temporary files older than max_age seconds"""
+    cutoff = time.time() - max_age
+    removed = 0
+    for pattern in TEMP_PATTERNS:
+        for path in glob.glob(pattern, recursive=True):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    _prune_empty_dirs(os.path.dirname(path))
+                    removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def run_maintenance(now=None, retention_days=None, archive_after_months=None, temp_max_age=None):
+    """One pass of every storage task with the configured limits; returns a count per task"""
+    now = now or datetime.now()
+    retention_days = Config.DOCUMENT_RETENTION_DAYS if retention_days is None else retention_days
+    archive_after_months = Config.ARCHIVE_AFTER_MONTHS if archive_after_months is None else archive_after_months
+    temp_max_age = Config.TEMP_FILE_MAX_AGE if temp_max_age is None else temp_max_age
+
+    stats = {"sharded": shard_flat_documents(), "expired": 0, "archived": 0}
+    if retention_days > 0:
+        stats["expired"] = apply_retention((now - timedelta(days=retention_days)).strftime("%Y-%m-%d"))
+    if archive_after_months > 0:
+        stats["archived"] = archive_months(_month_start(now, archive_after_months))
+    stats["temp_files"] = collect_temp_files(temp_max_age)
+    return stats
+
+
+def _month_start(now, months_back):
+    """'YYYY-MM-01' of the month `months_back` months before now's"""
+    index = now.year * 12 + now.month - 1 - months_back
+    return f"{index // 12:04d}-{index % 12 + 1:02d}-01"
+
+
+@contextmanager
+def _archive_lock(archive):
+    """Exclusive lock shared by every process rewriting `archive`"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(archive), exist_ok=True)
+    with open(f"{archive}.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _rewrite_archive(archive, add=(), drop=()):
+    """
+    Write `archive` again with (arcname, path) pairs added and names in `drop`
+    left out; callers hold _archive_lock(archive). The new archive is built aside and swapped in, so readers never
+    see a partial file; an archive left with no members is deleted.
+    """
+    added = {name for name, _ in add}
+    os.makedirs(os.path.dirname(archive), exist_ok=True)
+    tmp = f"{archive}.{os.getpid()}.tmp"
+    count = 0
+    with zipfile.ZipFile(tmp, "w", allowZip64=True) as out:
+        if os.path.isfile(archive):
+            with zipfile.ZipFile(archive) as current:
+                for info in current.infolist():
+                    if info.filename in drop or info.filename in added:
+                        continue
+                    with current.open(info) as src, out.open(info, "w") as dst:
+                        shutil.copyfileobj(src, dst)
+                    count += 1
+        for name, path in add:
+            # .docx files are already deflated
+            out.write(path, arcname=name, compress_type=zipfile.ZIP_STORED)
+            count += 1
+    if count:
+        os.replace(tmp, archive)
+    else:
+        os.remove(tmp)
+        if os.path.exists(archive):
+            os.remove(archive)
+
+
+def _prune_empty_dirs(directory):
+    """Remove empty shard directories up to (not including) the documents folder"""
+    root = os.path.normpath(Config.DOCUMENTS_FOLDER)
+    directory = os.path.normpath(directory)
+    while directory != root and directory.startswith(root + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
@@ -1,126 +1,244 @@
-import os
-import openpyxl
-from datetime import datetime
+import csv
+import io
+import json
 import logging
+import tempfile
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+
+from logic import submission_log
+from logic.submission_store import iter_submissions, iter_child_rows, get_column_widths
+from logic.metrics import stage_timer
+from logic.models import Will
+from logic.serializers import will_to_excel_record
+from logic.submission_layout import (
+    SUBMISSION_HEADERS, BENEFICIARY_HEADERS, ATTORNEY_HEADERS, legacy_width_key, will_to_rows,
+)
+from logic.zip_stream import GeneratedMember, iter_zip
 
 logger = logging.getLogger(__name__)
 
-def log_to_excel(form_data, document_path=None):
+# Legacy wide layout (matches your old Google Sheets exactly) - compatibility exports only;
+# the log itself is normalized (see logic.submission_layout)
+EXCEL_HEADERS = [
+    # Personal Information
+    "name", "phone", "email", "gender", "dob",
+    "street_number", "street_name", "city", "regional_municipality", "province", "postal_code",
+
+    # Executors
+    "exec1_name", "exec1_relation", "exec1_dob",
+    "include_exec2", "exec2_name", "exec2_relation", "exec2_dob",
+
+    # Wassiyat & Gifts
+    "wassiyat_include", "wassiyat_percentage",
+    "specific_gift_include", "specific_gift_text",
+    "equal_shares"
+]
+
+# Beneficiaries (1–50) - matches your old format
+EXCEL_HEADERS += [h for i in range(1, 51) for h in (f"relation{i}", f"name{i}", f"dob{i}", f"share{i}")]
+
+# POA & Mirror - matches your old format
+EXCEL_HEADERS += [
+    # General POA
+    "include_poa",
+    "poa_name_one", "poa_relation_one", "poa_dob_one",
+    "poa_street_number_one", "poa_street_name_one", "poa_city_one",
+    "poa_regional_municipality_one", "poa_province_one", "poa_postal_code_one",
+
+    # Alternate POA
+    "second_poa", "poa_name_two", "poa_relation_two", "poa_dob_two",
+    "poa_street_number_two", "poa_street_name_two", "poa_city_two",
+    "poa_regional_municipality_two", "poa_province_two", "poa_postal_code_two",
+
+    # Personal Care POA
+    "include_poa_personal_care", "poa_name_three", "poa_relation_three", "poa_dob_three",
+    "poa_street_number_three", "poa_street_name_three", "poa_city_three",
+    "poa_regional_municipality_three", "poa_province_three", "poa_postal_code_three",
+
+    # Alternate Personal Care POA
+    "second_poa_personal_care", "poa_name_four", "poa_relation_four", "poa_dob_four",
+    "poa_street_number_four", "poa_street_name_four", "poa_city_four",
+    "poa_regional_municipality_four", "poa_province_four", "poa_postal_code_four",
+
+    # Mirror Will
+    "mirror_will", "mirror_will_notes", "mirror_poa", "mirror_poa_care"
+]
+
+CHECKBOX_FIELDS = [
+    "include_exec2", "wassiyat_include", "specific_gift_include", "equal_shares",
+    "include_poa", "second_poa", "include_poa_personal_care", "second_poa_personal_care",
+    "mirror_will", "mirror_poa", "mirror_poa_care"
+]
+
+
+def flatten_form_data(form_data, will=None):
     """
-    Logs full will form data in flattened structure to Excel.
+    Flatten one submission into a row of strings in EXCEL_HEADERS order.
     Matches your old Google Sheets format exactly.
+    will: the already-parsed Will for form_data, if the caller has one.
     """
-    excel_file = "will_data_log.xlsx"
-
-    # Full header layout (matches your old Google Sheets exactly)
-    headers = [
-        # Personal Information
-        "name", "phone", "email", "gender", "dob",
-        "street_number", "street_name", "city", "regional_municipality", "province", "postal_code",
-        
-        # Executors
-        "exec1_name", "exec1_relation", "exec1_dob",
-        "include_exec2", "exec2_name", "exec2_relation", "exec2_dob",
-        
-        # Wassiyat & Gifts
-        "wassiyat_include", "wassiyat_percentage",
-        "specific_gift_include", "specific_gift_text",
-        "equal_shares"
-    ]
+    record = will_to_excel_record(will or Will.from_form(form_data))
+    return [record.get(h, "") for h in EXCEL_HEADERS]
 
-    # Beneficiaries (1–50) - matches your old format
-    for i in range(1, 51):
-        headers += [f"relation{i}", f"name{i}", f"dob{i}", f"share{i}"]
-
-    # POA & Mirror - matches your old format
-    headers += [
-        # General POA
-        "include_poa",
-        "poa_name_one", "poa_relation_one", "poa_dob_one",
-        "poa_street_number_one", "poa_street_name_one", "poa_city_one",
-        "poa_regional_municipality_one", "poa_province_one", "poa_postal_code_one",
-        
-        # Alternate POA
-        "second_poa", "poa_name_two", "poa_relation_two", "poa_dob_two",
-        "poa_street_number_two", "poa_street_name_two", "poa_city_two",
-        "poa_regional_municipality_two", "poa_province_two", "poa_postal_code_two",
-        
-        # Personal Care POA
-        "include_poa_personal_care", "poa_name_three", "poa_relation_three", "poa_dob_three",
-        "poa_street_number_three", "poa_street_name_three", "poa_city_three",
-        "poa_regional_municipality_three", "poa_province_three", "poa_postal_code_three",
-        
-        # Alternate Personal Care POA
-        "second_poa_personal_care", "poa_name_four", "poa_relation_four", "poa_dob_four",
-        "poa_street_number_four", "poa_street_name_four", "poa_city_four",
-        "poa_regional_municipality_four", "poa_province_four", "poa_postal_code_four",
-        
-        # Mirror Will
-        "mirror_will", "mirror_will_notes", "mirror_poa", "mirror_poa_care"
-    ]
 
-    # Create or open workbook
-    if os.path.exists(excel_file):
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-    else:
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.append(headers)
-
-    # FIXED: Process beneficiaries from individual fields instead of list
-    flat_beneficiaries = {}
-    for i in range(1, 51):
-        # Check if beneficiary exists (has at least name and relation)
-        name = form_data.get(f"beneficiary_{i}_name")
-        relation = form_data.get(f"beneficiary_{i}_relation")
-        
-        if name or relation:  # If either exists, include the beneficiary
-            flat_beneficiaries[f"relation{i}"] = relation or ""
-            flat_beneficiaries[f"name{i}"] = name or ""
-            flat_beneficiaries[f"dob{i}"] = form_data.get(f"beneficiary_{i}_dob", "")
-            flat_beneficiaries[f"share{i}"] = form_data.get(f"beneficiary_{i}_share", "")
-        else:
-            # Clear any previous data for this beneficiary slot
-            flat_beneficiaries[f"relation{i}"] = ""
-            flat_beneficiaries[f"name{i}"] = ""
-            flat_beneficiaries[f"dob{i}"] = ""
-            flat_beneficiaries[f"share{i}"] = ""
-
-    # FIXED: Convert boolean values to "yes"/"no" like your old app
-    processed_data = {}
-    for key, value in form_data.items():
-        if isinstance(value, bool):
-            processed_data[key] = "yes" if value else "no"
-        elif value is None:
-            processed_data[key] = ""
-        else:
-            processed_data[key] = value
-
-    # FIXED: Handle checkbox fields that might be missing
-    checkbox_fields = [
-        "include_exec2", "wassiyat_include", "specific_gift_include", "equal_shares",
-        "include_poa", "second_poa", "include_poa_personal_care", "second_poa_personal_care",
-        "mirror_will", "mirror_poa", "mirror_poa_care"
+def log_to_excel(form_data, document_path=None):
+    """
+    Records one submission in the submission store.
+    The Excel workbook is no longer rewritten per submit - it is built on demand
+    from the store by iter_xlsx_export(). Rows go through the single group-commit
+    writer (logic.submission_log); this returns once the row is committed. The
+    store splits out the beneficiary and attorney rows, so nothing is flattened
+    here.
+    """
+    with stage_timer("log.append"):
+        submission_id = submission_log.append(form_data, document_path)
+    logger.info(f"✅ Logged submission {submission_id} to the submission store")
+    return True
+
+
+# ============================================================
+# 📦 STREAMING EXPORTS
+# ============================================================
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+SUBMISSION_EXPORT_HEADERS = ["id", "created_at", *SUBMISSION_HEADERS]
+BENEFICIARY_EXPORT_HEADERS = ["submission_id", *BENEFICIARY_HEADERS]
+ATTORNEY_EXPORT_HEADERS = ["submission_id", *ATTORNEY_HEADERS]
+
+
+def _submission_rows(start=None, end=None):
+    """One row per will in SUBMISSION_EXPORT_HEADERS order"""
+    for submission in iter_submissions(start, end):
+        record = will_to_rows(Will.from_form(submission["data"]))[0]
+        yield [submission["id"], submission["created_at"], *(record.get(h, "") for h in SUBMISSION_HEADERS)]
+
+
+def _normalized_tables(start=None, end=None):
+    """(name, headers, width key prefix, rows) for each table of the normalized layout"""
+    return [
+        ("Submissions", SUBMISSION_EXPORT_HEADERS, "", _submission_rows(start, end)),
+        ("Beneficiaries", BENEFICIARY_EXPORT_HEADERS, "beneficiaries.", iter_child_rows("beneficiaries", start, end)),
+        ("Attorneys", ATTORNEY_EXPORT_HEADERS, "attorneys.", iter_child_rows("attorneys", start, end)),
     ]
-    
-    for field in checkbox_fields:
-        if field not in processed_data:
-            processed_data[field] = "no"
 
-    # Combine everything into one flat record
-    flat_data = {**processed_data, **flat_beneficiaries}
 
-    # Write row in header order
-    row = []
+def _legacy_rows(start=None, end=None):
+    for submission in iter_submissions(start, end):
+        yield flatten_form_data(submission["data"])
+
+
+def _iter_csv(headers, rows):
+    """Yield rows as CSV text, one chunk per ~64 KB."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_csv_export(start=None, end=None):
+    """Yield a ZIP of submissions.csv, beneficiaries.csv and attorneys.csv (normalized layout)."""
+    return iter_zip(
+        (f"{name.lower()}.csv", GeneratedMember(_iter_csv(headers, rows)))
+        for name, headers, _, rows in _normalized_tables(start, end)
+    )
+
+
+def iter_legacy_csv_export(start=None, end=None):
+    """Yield the legacy wide layout as CSV text, one chunk per ~64 KB."""
+    return _iter_csv(EXCEL_HEADERS, _legacy_rows(start, end))
+
+
+def iter_jsonl_export(start=None, end=None):
+    """Yield one JSON object per will: non-empty fields plus its beneficiaries and attorneys lists."""
+    for submission in iter_submissions(start, end):
+        record, beneficiaries, attorneys = will_to_rows(Will.from_form(submission["data"]))
+        item = {"id": submission["id"], "created_at": submission["created_at"]}
+        item.update((h, record[h]) for h in SUBMISSION_HEADERS if record.get(h))
+        item["beneficiaries"] = [dict(zip(BENEFICIARY_HEADERS, row)) for row in beneficiaries]
+        item["attorneys"] = [dict(zip(ATTORNEY_HEADERS, row)) for row in attorneys]
+        yield json.dumps(item) + "\n"
+
+
+def iter_legacy_jsonl_export(start=None, end=None):
+    """Yield one JSON object per submission (non-empty legacy columns only)."""
+    for submission in iter_submissions(start, end):
+        record = {"id": submission["id"], "created_at": submission["created_at"]}
+        for h, v in zip(EXCEL_HEADERS, flatten_form_data(submission["data"])):
+            if v:
+                record[h] = v
+        yield json.dumps(record) + "\n"
+
+
+def _append_sheet(wb, title, headers, widths, rows):
+    """
+    Add a write-only sheet: sized columns, frozen styled header row, then rows.
+    widths gives each header's column width in characters.
+    """
+    ws = wb.create_sheet(title)
+
+    # 🔠 Column widths from running maxima kept at log time
+    for idx, (h, width) in enumerate(zip(headers, widths), start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = min(max(max(width, len(h)) + 4, 12), 60)
+
+    # 🧊 Freeze top row
+    ws.freeze_panes = "A2"
+
+    # 🟦 Header Styling
+    header_fill = PatternFill(start_color="1E3A8A", end_color="1E3A8A", fill_type="solid")
+    header_font = Font(color="FFFFFF", bold=True)
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    header = []
     for h in headers:
-        val = flat_data.get(h, "")
-        # Ensure empty values are properly handled
-        if val is None:
-            val = ""
-        row.append(str(val))
-
-    ws.append(row)
-    wb.save(excel_file)
-    logger.info("✅ Logged structured data to Excel successfully")
-    return True
\ No newline at end of file
+        cell = WriteOnlyCell(ws, value=h)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    for row in rows:
+        ws.append(row)
+
+
+def _iter_workbook(wb):
+    """The finished zip is spooled through an anonymous temp file, never left on disk."""
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_xlsx_export(start=None, end=None):
+    """
+    Yield a styled workbook in the normalized layout as bytes: a Submissions
+    sheet with one row per will, and Beneficiaries and Attorneys sheets keyed
+    by submission id. Rows go through openpyxl's write-only mode, so memory stays flat.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    widths = get_column_widths()
+    for title, headers, prefix, rows in _normalized_tables(start, end):
+        _append_sheet(wb, title, headers, [widths.get(prefix + h, 0) for h in headers], rows)
+    yield from _iter_workbook(wb)
+
+
+def iter_legacy_xlsx_export(start=None, end=None):
+    """Yield the legacy wide-layout workbook (one sheet, EXCEL_HEADERS columns) as bytes."""
+    wb = openpyxl.Workbook(write_only=True)
+    widths = get_column_widths()
+    column_widths = [max(widths.get(h, 0), widths.get(legacy_width_key(h), 0)) for h in EXCEL_HEADERS]
+    _append_sheet(wb, "Submissions", EXCEL_HEADERS, column_widths, _legacy_rows(start, end))
+    yield from _iter_workbook(wb)
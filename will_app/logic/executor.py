@@ -1,29 +1,35 @@
 from helpers.formatters import format_date
+from logic.models import Will
 
 def process_executor_data(form_data):
     """
     Process executor information
     """
+    return executor_context(Will.from_form(form_data))
+
+def executor_context(will):
+    """Template fields for the executors, Wassiyat and specific gift of a Will"""
+    first, second = will.executors
     context = {
-        "executor_name_one": form_data.get('exec1_name', ''),
-        "executor_dob_one": format_date(form_data.get('exec1_dob', '')),
-        "relation_executor_one": form_data.get('exec1_relation', ''),
-        "include_second_executor": form_data.get('include_second_executor') in ['true', 'True', '1', True]
+        "executor_name_one": first.name,
+        "executor_dob_one": format_date(first.dob),
+        "relation_executor_one": first.relation,
+        "include_second_executor": will.include_second_executor
     }
     
-    if context["include_second_executor"]:
+    if will.include_second_executor:
         context.update({
-            "executor_name_second": form_data.get('exec2_name', ''),
-            "executor_dob_second": format_date(form_data.get('exec2_dob', '')),
-            "relation_executor_second": form_data.get('exec2_relation', '')
+            "executor_name_second": second.name,
+            "executor_dob_second": format_date(second.dob),
+            "relation_executor_second": second.relation
         })
     
     # Wassiyat
-    if form_data.get('wassiyat_include') in ['true', 'True', '1', True]:
-        context["wassiyat_percentage_placeholder"] = form_data.get('wassiyat_percentage', '')
+    if will.wassiyat_include:
+        context["wassiyat_percentage_placeholder"] = will.wassiyat_percentage
     
     # Specific gift
-    if form_data.get('specific_gift_include') in ['true', 'True', '1', True]:
-        context["specific_gift"] = form_data.get('specific_gift_text', '')
+    if will.specific_gift_include:
+        context["specific_gift"] = will.specific_gift_text
     
     return context
\ No newline at end of file
@@ -0,0 +1,159 @@
+# logic/metrics.py
+"""
+In-process latency metrics.
+
+Pipeline stages (validation, context assembly, uppercase conversion, render,
+disk write, submission store append, ...) and every HTTP request are recorded
+into fixed-bucket histograms, exported in Prometheus text format by /metrics.
+A bounded window of recent samples per stage backs the p50/p95/p99 shown on
+the admin dashboard.
+
+Render pool workers do not keep their own registry: samples taken inside a
+worker are captured and shipped back with the result, then recorded here.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds in seconds; +Inf is implicit
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+RECENT_SAMPLES = 1000
+
+_lock = threading.Lock()
+_stages = {}
+_requests = {}
+_capture = None
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+
+def observe_stage(stage, seconds):
+    """Record one duration for a pipeline stage"""
+    if _capture is not None:
+        _capture.append((stage, seconds))
+        return
+    with _lock:
+        _stages.setdefault(stage, _Histogram()).observe(seconds)
+
+
+def record_samples(samples):
+    """Record (stage, seconds) pairs captured in another process"""
+    for stage, seconds in samples:
+        observe_stage(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage):
+    """Time the body of a with-block as one sample of `stage`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def capture_samples():
+    """
+    Collect stage samples into a list instead of the registry (for worker
+    processes, whose registry nobody scrapes).
+    """
+    global _capture
+    _capture = samples = []
+    try:
+        yield samples
+    finally:
+        _capture = None
+
+
+def observe_request(endpoint, method, status, seconds):
+    with _lock:
+        _requests.setdefault((endpoint, method, str(status)), _Histogram()).observe(seconds)
+
+
+def init_app(app):
+    """Time every request the app serves, labelled by endpoint, method and status"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request_time(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            observe_request(request.endpoint or "unmatched", request.method, response.status_code,
+                            time.perf_counter() - started)
+        return response
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def stage_percentiles():
+    """{stage: {"count", "p50", "p95", "p99"}} over recent samples, in milliseconds"""
+    with _lock:
+        snapshot = {stage: (h.count, sorted(h.recent)) for stage, h in _stages.items()}
+    summary = {}
+    for stage, (count, ordered) in sorted(snapshot.items()):
+        if not ordered:
+            continue
+        summary[stage] = {
+            "count": count,
+            "p50": _percentile(ordered, 0.50) * 1000,
+            "p95": _percentile(ordered, 0.95) * 1000,
+            "p99": _percentile(ordered, 0.99) * 1000,
+        }
+    return summary
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _histogram_lines(name, label_names, series):
+    lines = []
+    for labels, h in sorted(series.items()):
+        base = ",".join(f'{k}="{_escape_label(v)}"' for k, v in zip(label_names, labels))
+        cumulative = 0
+        for bound, n in zip(BUCKETS, h.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{base},le="+Inf"}} {h.count}')
+        lines.append(f"{name}_sum{{{base}}} {h.total}")
+        lines.append(f"{name}_count{{{base}}} {h.count}")
+    return lines
+
+
+def render_prometheus():
+    """All histograms in Prometheus text exposition format (version 0.0.4)"""
+    with _lock:
+        lines = [
+            "# HELP will_stage_duration_seconds Duration of submission pipeline stages.",
+            "# TYPE will_stage_duration_seconds histogram",
+            *_histogram_lines("will_stage_duration_seconds", ("stage",),
+                              {(stage,): h for stage, h in _stages.items()}),
+            "# HELP will_http_request_duration_seconds Duration of HTTP requests.",
+            "# TYPE will_http_request_duration_seconds histogram",
+            *_histogram_lines("will_http_request_duration_seconds", ("endpoint", "method", "status"), _requests),
+        ]
+    return "\n".join(lines) + "\n"
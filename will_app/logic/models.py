@@ -0,0 +1,188 @@
+# logic/models.py
+"""
+Typed domain model for one will.
+
+The web form submits a flat dict with generated keys (beneficiary_3_share,
+poa_street_name_three, exec1_city, ...). Will.from_form() reads it once into
+small slotted dataclasses; logic.serializers turns a Will into the docxtpl
+context and the legacy spreadsheet record. Values keep the form's raw text -
+formatting (dates, title case, addresses) happens in the serializers.
+"""
+from dataclasses import dataclass, field, replace
+
+from helpers.formatters import safe_bool
+from helpers.indexed_fields import parse_indexed_fields, BENEFICIARY_FIELDS, POA_SLOTS
+
+SPOUSE_TERMS = ("wife", "husband", "spouse")
+
+ADDRESS_FIELDS = ("street_number", "street_name", "city", "regional_municipality", "province", "postal_code")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def is_spouse(relation):
+    relation = relation.lower()
+    return any(term in relation for term in SPOUSE_TERMS)
+
+
+@dataclass(slots=True)
+class Address:
+    street_number: str = ""
+    street_name: str = ""
+    city: str = ""
+    regional_municipality: str = ""
+    province: str = ""
+    postal_code: str = ""
+
+    @classmethod
+    def from_form(cls, form_data, key):
+        """key is a format string naming the form field, e.g. 'exec1_{}'"""
+        return cls(*(_text(form_data.get(key.format(name), "")) for name in ADDRESS_FIELDS))
+
+    @classmethod
+    def from_record(cls, record):
+        """From a grouped record keyed by bare field names (street_number, city, ...)"""
+        return cls(*(_text(record.get(name, "")) for name in ADDRESS_FIELDS))
+
+
+@dataclass(slots=True)
+class Applicant:
+    name: str = ""
+    gender: str = ""
+    dob: str = ""
+    phone: str = ""
+    email: str = ""
+    address: Address = field(default_factory=Address)
+
+
+@dataclass(slots=True)
+class Executor:
+    name: str = ""
+    relation: str = ""
+    dob: str = ""
+    address: Address = field(default_factory=Address)
+
+
+@dataclass(slots=True)
+class Beneficiary:
+    slot: int
+    name: str = ""
+    relation: str = ""
+    dob: str = ""
+    share: str = ""
+
+
+@dataclass(slots=True)
+class Attorney:
+    name: str = ""
+    relation: str = ""
+    dob: str = ""
+    address: Address = field(default_factory=Address)
+    # Set on a mirror will's spouse attorney: the address is the testator's own
+    # and is written the way the testator's address is
+    lives_with_applicant: bool = False
+
+    @classmethod
+    def from_record(cls, record):
+        """From one grouped poa_<field>_<slot> record (see parse_indexed_fields)"""
+        return cls(_text(record.get("name", "")), _text(record.get("relation", "")),
+                   _text(record.get("dob", "")), Address.from_record(record))
+
+
+@dataclass(slots=True)
+class Will:
+    applicant: Applicant
+    executors: list          # primary first; the second is kept even when not included
+    beneficiaries: list      # Beneficiary records in slot order, including incomplete ones
+    attorneys: dict          # POA slot ("one".."four") -> Attorney
+    include_second_executor: bool = False
+    equal_shares: bool = False
+    wassiyat_include: bool = False
+    wassiyat_percentage: str = ""
+    specific_gift_include: bool = False
+    specific_gift_text: str = ""
+    include_poa: bool = False
+    second_poa: bool = False
+    include_poa_personal_care: bool = False
+    second_poa_personal_care: bool = False
+    mirror_will: bool = False
+    mirror_poa: bool = False
+    mirror_poa_personal_care: bool = False
+    mirror_notes: str = ""
+    is_mirror: bool = False
+
+    @classmethod
+    def from_form(cls, form_data):
+        """Parse the flat form dict (web form, session, batch row or stored submission)"""
+        get = form_data.get
+        indexed = parse_indexed_fields(form_data)
+
+        beneficiaries = []
+        for n, record in indexed["beneficiaries"].items():
+            values = [record.get(name) for name in BENEFICIARY_FIELDS]
+            if any(values):
+                beneficiaries.append(Beneficiary(n, *(_text(v) for v in values)))
+
+        return cls(
+            applicant=Applicant(
+                name=_text(get("name", "")),
+                gender=_text(get("gender", "")),
+                dob=_text(get("dob", "")),
+                phone=_text(get("phone", "")),
+                email=_text(get("email", "")),
+                address=Address.from_form(form_data, "{}"),
+            ),
+            executors=[
+                Executor(_text(get(f"exec{n}_name", "")), _text(get(f"exec{n}_relation", "")),
+                         _text(get(f"exec{n}_dob", "")), Address.from_form(form_data, f"exec{n}_{{}}"))
+                for n in (1, 2)
+            ],
+            beneficiaries=beneficiaries,
+            attorneys={slot: Attorney.from_record(indexed["attorneys"].get(slot, {})) for slot in POA_SLOTS},
+            include_second_executor=safe_bool(get("include_second_executor")),
+            equal_shares=safe_bool(get("equal_shares")),
+            wassiyat_include=safe_bool(get("wassiyat_include")),
+            wassiyat_percentage=_text(get("wassiyat_percentage", "")),
+            specific_gift_include=safe_bool(get("specific_gift_include")),
+            specific_gift_text=_text(get("specific_gift_text", "")),
+            include_poa=safe_bool(get("include_poa")),
+            second_poa=safe_bool(get("second_poa")),
+            include_poa_personal_care=safe_bool(get("include_poa_personal_care")),
+            second_poa_personal_care=safe_bool(get("second_poa_personal_care")),
+            mirror_will=safe_bool(get("mirror_will")),
+            mirror_poa=safe_bool(get("mirror_poa")),
+            mirror_poa_personal_care=safe_bool(get("mirror_poa_personal")),
+            mirror_notes=_text(get("mirror_notes", "")),
+        )
+
+    def mirrored(self):
+        """
+        The spouse's mirror will: the primary executor (who must be the spouse)
+        becomes the testator and the testator becomes the primary executor.
+        The spouse moves into the testator's address only if they have their
+        own on file; spouse attorneys on the general and personal care POA
+        are replaced by the original testator.
+        """
+        applicant, spouse = self.applicant, self.executors[0]
+        if not is_spouse(spouse.relation):
+            raise ValueError("Cannot create mirror will - spouse must be primary executor")
+
+        moves = bool(spouse.address.street_number)
+        gender = {"male": "Female", "female": "Male"}.get(applicant.gender.lower(), applicant.gender)
+        new_applicant = Applicant(spouse.name, gender, spouse.dob, applicant.phone, applicant.email,
+                                  spouse.address if moves else applicant.address)
+        new_spouse = Executor(applicant.name, "SPOUSE", applicant.dob,
+                              applicant.address if moves else spouse.address)
+
+        attorneys = dict(self.attorneys)
+        for slot, included in (("one", self.include_poa), ("three", self.include_poa_personal_care)):
+            if included and is_spouse(attorneys[slot].relation):
+                attorneys[slot] = Attorney(applicant.name, "SPOUSE", applicant.dob, new_applicant.address,
+                                           lives_with_applicant=True)
+
+        return replace(self, applicant=new_applicant, executors=[new_spouse, *self.executors[1:]],
+                       attorneys=attorneys, is_mirror=True)
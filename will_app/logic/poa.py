@@ -1,75 +1,57 @@
 from helpers.formatters import format_date, format_address
 from copy import deepcopy
+from logic.models import Will
+from logic.document import format_address as document_format_address
 
 def process_poa_data(form_data):
     """
     Process Power of Attorney data - both general and personal care
     """
-    context = {}
+    return poa_context(Will.from_form(form_data))
 
-    # General POA
-    if form_data.get('include_poa') in ['true', 'True', '1', True]:
-        context.update({
-            "include_poa": True,
-            "poa_name_one": form_data.get('poa_name_one', ''),
-            "poa_relation_one": form_data.get('poa_relation_one', ''),
-            "poa_dob_one": format_date(form_data.get('poa_dob_one', '')),
-            "poa_address_one": format_address({
-                'street_number': form_data.get('poa_street_number_one', ''),
-                'street_name': form_data.get('poa_street_name_one', ''),
-                'city': form_data.get('poa_city_one', ''),
-                'province': form_data.get('poa_province_one', ''),
-                'postal_code': form_data.get('poa_postal_code_one', '')
-            })
-        })
 
-        if form_data.get('second_poa') in ['true', 'True', '1', True]:
-            context.update({
-                "poa_name_two": form_data.get('poa_name_two', ''),
-                "poa_relation_two": form_data.get('poa_relation_two', ''),
-                "poa_dob_two": format_date(form_data.get('poa_dob_two', '')),
-                "poa_address_two": format_address({
-                    'street_number': form_data.get('poa_street_number_two', ''),
-                    'street_name': form_data.get('poa_street_name_two', ''),
-                    'city': form_data.get('poa_city_two', ''),
-                    'province': form_data.get('poa_province_two', ''),
-                    'postal_code': form_data.get('poa_postal_code_two', '')
-                })
-            })
+def poa_context(will):
+    """Template fields for the included attorneys of a Will"""
+    context = {}
 
-    # Personal Care POA
-    if form_data.get('include_poa_personal_care') in ['true', 'True', '1', True]:
-        context.update({
-            "include_poa_personal_care": True,
-            "poa_name_three": form_data.get('poa_name_three', ''),
-            "poa_relation_three": form_data.get('poa_relation_three', ''),
-            "poa_dob_three": format_date(form_data.get('poa_dob_three', '')),
-            "poa_address_three": format_address({
-                'street_number': form_data.get('poa_street_number_three', ''),
-                'street_name': form_data.get('poa_street_name_three', ''),
-                'city': form_data.get('poa_city_three', ''),
-                'province': form_data.get('poa_province_three', ''),
-                'postal_code': form_data.get('poa_postal_code_three', '')
-            })
-        })
+    # General POA (+ alternate), Personal Care POA (+ alternate)
+    if will.include_poa:
+        context["include_poa"] = True
+        context.update(_attorney_fields(will, "one"))
+        if will.second_poa:
+            context.update(_attorney_fields(will, "two"))
 
-        if form_data.get('second_poa_personal_care') in ['true', 'True', '1', True]:
-            context.update({
-                "poa_name_four": form_data.get('poa_name_four', ''),
-                "poa_relation_four": form_data.get('poa_relation_four', ''),
-                "poa_dob_four": format_date(form_data.get('poa_dob_four', '')),
-                "poa_address_four": format_address({
-                    'street_number': form_data.get('poa_street_number_four', ''),
-                    'street_name': form_data.get('poa_street_name_four', ''),
-                    'city': form_data.get('poa_city_four', ''),
-                    'province': form_data.get('poa_province_four', ''),
-                    'postal_code': form_data.get('poa_postal_code_four', '')
-                })
-            })
+    if will.include_poa_personal_care:
+        context["include_poa_personal_care"] = True
+        context.update(_attorney_fields(will, "three"))
+        if will.second_poa_personal_care:
+            context.update(_attorney_fields(will, "four"))
 
     return context
 
 
+def _attorney_fields(will, slot):
+    attorney = will.attorneys[slot]
+    address = attorney.address
+    if attorney.lives_with_applicant:
+        formatted = document_format_address(address.street_number, address.street_name, address.city,
+                                            address.regional_municipality, address.province, address.postal_code)
+    else:
+        formatted = format_address({
+            'street_number': address.street_number,
+            'street_name': address.street_name,
+            'city': address.city,
+            'province': address.province,
+            'postal_code': address.postal_code
+        })
+    return {
+        f"poa_name_{slot}": attorney.name,
+        f"poa_relation_{slot}": attorney.relation,
+        f"poa_dob_{slot}": format_date(attorney.dob),
+        f"poa_address_{slot}": formatted,
+    }
+
+
 def generate_mirrored_poa(original_poa_context):
     """
     Creates a mirrored Power of Attorney context by swapping the first and second attorneys.
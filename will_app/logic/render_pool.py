@@ -0,0 +1,138 @@
+# logic/render_pool.py
+"""
+Process pool for rendering several documents of one submission concurrently.
+
+docxtpl renders are CPU-bound, so the main will and the mirror will serialize
+on the GIL when rendered from threads. Here each document is rendered in its own
+worker process. Workers are forked from a parent whose template cache is
+already warm, and warm it themselves otherwise, so no render pays the parse cost.
+
+start_render_pool() forks the workers up front, before the process runs any
+other thread (see app.start_background_services): a fork taken while request,
+job or log-writer threads hold a logging, queue or sqlite lock can leave the
+child deadlocked. A pool re-created once threads are running (after a worker
+died) is started with forkserver instead.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+from functools import partial
+
+from logic.document import generate_word_document
+from logic.template_cache import load_template
+from logic.metrics import capture_samples, record_samples
+
+logger = logging.getLogger(__name__)
+
+# Document kind -> renderer(context) returning the saved path.
+# Mirror contexts arrive already mirrored (SubmissionService.build_mirror_context).
+RENDERERS = {
+    "will": generate_word_document,
+    "mirror": partial(generate_word_document, is_mirror=True),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _warm_worker():
+    try:
+        load_template()
+    except Exception as e:
+        logger.error(f"Render worker could not preload template: {str(e)}")
+
+
+def _render(kind, context):
+    return RENDERERS[kind](context)
+
+
+def _render_in_worker(kind, context):
+    # Stage timings taken in the worker travel back with the path
+    with capture_samples() as samples:
+        path = _render(kind, context)
+    return path, samples
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Warm the parent first so forked workers share the parsed template
+                _warm_worker()
+                methods = multiprocessing.get_all_start_methods()
+                if "fork" in methods and threading.active_count() == 1:
+                    method = "fork"
+                else:
+                    method = "forkserver" if "forkserver" in methods else "spawn"
+                _executor = ProcessPoolExecutor(
+                    max_workers=Config.RENDER_PROCESSES,
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=_warm_worker,
+                )
+    return _executor
+
+
+def start_render_pool():
+    """Start the render workers now, while this is the process's only thread"""
+    if Config.RENDER_PROCESSES <= 0:
+        return
+    # A fork-based pool launches all of its workers on the first submit
+    _get_executor().submit(_warm_worker).result()
+
+
+def shutdown_render_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def render_documents(tasks):
+    """
+    Render several documents concurrently.
+
+    tasks: list of (kind, context) pairs, kind being a key of RENDERERS.
+    Returns {kind: {"path": str|None, "error": str|None}} so callers can
+    report each document's failure separately.
+    """
+    results = {}
+    if Config.RENDER_PROCESSES <= 0 or len(tasks) < 2:
+        for kind, context in tasks:
+            results[kind] = _render_inline(kind, context)
+        return results
+
+    try:
+        executor = _get_executor()
+        futures = {kind: executor.submit(_render_in_worker, kind, context) for kind, context in tasks}
+    except (BrokenProcessPool, RuntimeError) as e:
+        logger.warning(f"Render pool unavailable, rendering inline: {str(e)}")
+        shutdown_render_pool()
+        for kind, context in tasks:
+            results[kind] = _render_inline(kind, context)
+        return results
+
+    for kind, future in futures.items():
+        try:
+            path, samples = future.result()
+            record_samples(samples)
+            results[kind] = {"path": path, "error": None}
+        except BrokenProcessPool as e:
+            logger.warning(f"Render worker died while rendering {kind}, retrying inline: {str(e)}")
+            shutdown_render_pool()
+            results[kind] = _render_inline(kind, dict(tasks)[kind])
+        except Exception as e:
+            results[kind] = {"path": None, "error": str(e)}
+    return results
+
+
+def _render_inline(kind, context):
+    try:
+        return {"path": _render(kind, context), "error": None}
+    except Exception as e:
+        return {"path": None, "error": str(e)}
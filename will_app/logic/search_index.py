@@ -0,0 +1,57 @@
+# logic/search_index.py
+"""
+What the submission search index holds, and how admin queries are turned
+into FTS5 MATCH expressions.
+
+Each submission is indexed under three columns: every person's name
+(applicant, executors, beneficiaries, attorneys), every address and the
+contact details. Phone numbers and postal codes are also indexed with their
+punctuation and spaces stripped, so "4165550100" and "M5V1A1" find
+"416-555-0100" and "M5V 1A1". The table itself lives in the submission
+store (submissions_fts) and is written in the same transaction as the row.
+"""
+import re
+
+SEARCH_COLUMNS = ("names", "addresses", "contacts")
+
+# name, exec1_name, beneficiary_3_name, poa_name_two, ... (not street_name)
+_NAME_KEY = re.compile(r"^(?:name|exec\d+_name|beneficiary_\d+_name|poa_name_\w+)$")
+_ADDRESS_KEY = re.compile(r"(?:^|_)(?:street_number|street_name|city|regional_municipality|province|postal_code)(?:_|$)")
+_CONTACT_KEY = re.compile(r"(?:^|_)(?:email|phone)(?:_|$)")
+_COMPACT_KEY = re.compile(r"(?:^|_)(?:phone|postal_code)(?:_|$)")
+
+_TOKEN = re.compile(r"\w+")
+
+
+def index_fields(form_data):
+    """(names, addresses, contacts) text of one submission's form data"""
+    names, addresses, contacts = [], [], []
+    for key, value in form_data.items():
+        if not isinstance(value, str) or not value.strip():
+            continue
+        if _NAME_KEY.match(key):
+            names.append(value)
+        elif _CONTACT_KEY.search(key):
+            contacts.append(value)
+        elif _ADDRESS_KEY.search(key):
+            addresses.append(value)
+        else:
+            continue
+        if _COMPACT_KEY.search(key):
+            compact = "".join(_TOKEN.findall(value))
+            if compact != value:
+                (contacts if _CONTACT_KEY.search(key) else addresses).append(compact)
+    return " ".join(names), " ".join(addresses), " ".join(contacts)
+
+
+def match_query(text):
+    """
+    FTS5 MATCH expression for free text typed into the admin search: every
+    word must match the start of an indexed word, in any column. Quoting
+    each word keeps FTS5 operators (AND, NEAR, *, ^, :) out of user input.
+    Returns None when the text holds no searchable word.
+    """
+    words = _TOKEN.findall(text or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
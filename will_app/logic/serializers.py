@@ -0,0 +1,76 @@
+# logic/serializers.py
+"""
+Serializers from the Will model to the shapes the rest of the app consumes:
+the docxtpl context rendered into the Word template, and the legacy
+spreadsheet record (one value per EXCEL_HEADERS column, built from the
+normalized rows of logic.submission_layout).
+"""
+from helpers.formatters import format_date
+from logic.beneficiaries import beneficiaries_context
+from logic.document import format_address as document_format_address
+from logic.executor import executor_context
+from logic.poa import poa_context
+from logic.submission_layout import legacy_record, will_to_rows
+
+
+def will_to_context(will):
+    """Template context for a Will (or for its mirror, when will.is_mirror)"""
+    applicant = will.applicant
+    address = applicant.address
+    executor_address = will.executors[0].address
+
+    personal_address = document_format_address(
+        address.street_number,
+        address.street_name,
+        address.city,
+        address.regional_municipality,
+        address.province,
+        address.postal_code
+    )
+
+    gender = applicant.gender.lower()
+    if gender == "male":
+        pronoun = "his"
+    elif gender == "female" or not will.is_mirror:
+        pronoun = "her"
+    else:
+        pronoun = "their"
+
+    context = {
+        **poa_context(will),
+        **executor_context(will),
+        **beneficiaries_context(will),
+        # Personal Information
+        "name": applicant.name,
+        "gender": applicant.gender,
+        "dob": format_date(applicant.dob),
+        "address": personal_address,
+        "full_address": personal_address,
+        "city": address.city,
+        "regional_municipality": address.regional_municipality,
+        "street_number": address.street_number,
+        "street_name": address.street_name,
+        "province": address.province,
+        "postal_code": address.postal_code,
+        # Primary executor's address, swapped in by a mirror will
+        "exec1_street_number": executor_address.street_number,
+        "exec1_street_name": executor_address.street_name,
+        "exec1_city": executor_address.city,
+        "exec1_regional_municipality": executor_address.regional_municipality,
+        "exec1_province": executor_address.province,
+        "exec1_postal_code": executor_address.postal_code,
+        "pronoun": pronoun,
+        # Mirror will options from form
+        "mirror_will": will.mirror_will,
+        "mirror_poa": will.mirror_poa,
+        "mirror_notes": will.mirror_notes,
+    }
+    if will.is_mirror:
+        context["is_mirror"] = True
+        context["name_display"] = f"{applicant.name} (MIRROR WILL)"
+    return context
+
+
+def will_to_excel_record(will):
+    """Legacy spreadsheet columns (see excel_logger.EXCEL_HEADERS) -> text"""
+    return legacy_record(*will_to_rows(will))
@@ -0,0 +1,163 @@
+# logic/static_assets.py
+"""
+Fingerprinted, precompressed static assets.
+
+build_assets() (see build_assets.py) copies every stylesheet and script under
+static/css and static/js to Config.ASSET_BUILD_FOLDER with a content hash in
+its name (css/main.css -> css/main.3f2a9c1b04de.css), writes a gzip variant
+next to it and records the mapping in manifest.json. Templates link assets
+through asset_url(), which resolves to /assets/<fingerprinted name>; those
+responses never change, so they are served with a one-year immutable
+Cache-Control and the step pages load them without a single revalidation.
+An edited file gets a new name, so there is nothing to invalidate.
+
+The debug server skips all of this and serves static/ as-is, so edits show up
+on reload.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIRS = ("css", "js")
+MANIFEST = "manifest.json"
+IMMUTABLE = f"public, max-age={Config.ASSET_MAX_AGE}, immutable"
+
+
+def fingerprinted_name(filename, digest):
+    """css/main.css -> css/main.<first 12 hex of the hash>.css"""
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{digest[:12]}{ext}"
+
+
+def iter_sources(source):
+    """Relative paths (with forward slashes) of the assets under source"""
+    for folder in ASSET_DIRS:
+        root = os.path.join(source, folder)
+        for dirpath, _, files in os.walk(root):
+            for name in sorted(files):
+                if name.endswith((".css", ".js")):
+                    path = os.path.join(dirpath, name)
+                    yield os.path.relpath(path, source).replace(os.sep, "/")
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_manifest(target=None):
+    """{source name: fingerprinted name} of the last build, or {} if there is none"""
+    path = os.path.join(target or Config.ASSET_BUILD_FOLDER, MANIFEST)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_assets(source, target=None):
+    """
+    Fingerprint and gzip every asset under source into target and write the
+    manifest. Files of the previous build are kept (pages rendered by a worker
+    that has not restarted yet still link them); older ones are removed.
+    Returns the new manifest.
+    """
+    target = target or Config.ASSET_BUILD_FOLDER
+    previous = load_manifest(target)
+    manifest = {}
+    for filename in iter_sources(source):
+        with open(os.path.join(source, filename), "rb") as f:
+            data = f.read()
+        built = fingerprinted_name(filename, hashlib.sha256(data).hexdigest())
+        manifest[filename] = built
+        path = os.path.join(target, built)
+        if os.path.exists(path):
+            continue
+        _write(path, data)
+        # mtime=0 keeps the gzip bytes (and so their ETag) identical across builds
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data):
+            _write(path + ".gz", compressed)
+
+    _write(os.path.join(target, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    _prune(target, set(manifest.values()) | set(previous.values()))
+    return manifest
+
+
+def _prune(target, keep):
+    for dirpath, _, files in os.walk(target):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            built = os.path.relpath(path, target).replace(os.sep, "/")
+            if built == MANIFEST or built.removesuffix(".gz") in keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def is_stale(source, target=None):
+    """True when there is no build yet or an asset changed after the last one"""
+    path = os.path.join(target or Config.ASSET_BUILD_FOLDER, MANIFEST)
+    try:
+        built_at = os.path.getmtime(path)
+    except OSError:
+        return True
+    manifest = load_manifest(target)
+    for filename in iter_sources(source):
+        if filename not in manifest or os.path.getmtime(os.path.join(source, filename)) > built_at:
+            return True
+    return False
+
+
+def init_app(app):
+    """
+    Register asset_url() for templates and the /assets/ route. Outside debug
+    the build is refreshed first if the sources changed since the last one.
+    """
+    from flask import abort, request, send_file, url_for
+    from werkzeug.security import safe_join
+
+    target = app.config.get("ASSET_BUILD_FOLDER", Config.ASSET_BUILD_FOLDER)
+    manifest = {}
+    if not app.debug:
+        if is_stale(app.static_folder, target):
+            manifest = build_assets(app.static_folder, target)
+            logger.info(f"📦 Built {len(manifest)} static assets into {target}")
+        else:
+            manifest = load_manifest(target)
+
+    @app.template_global()
+    def asset_url(filename):
+        built = manifest.get(filename)
+        if built is None:
+            return url_for("static", filename=filename)
+        return url_for("asset", filename=built)
+
+    def asset(filename):
+        path = safe_join(target, filename)
+        if path is None or filename.endswith(".gz") or filename == MANIFEST or not os.path.isfile(path):
+            abort(404)
+        mimetype = mimetypes.guess_type(filename)[0]
+        compressed = path + ".gz"
+        if request.accept_encodings["gzip"] and os.path.isfile(compressed):
+            response = send_file(compressed, mimetype=mimetype, conditional=True)
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = send_file(path, mimetype=mimetype, conditional=True)
+        response.headers["Cache-Control"] = IMMUTABLE
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.add_url_rule("/assets/<path:filename>", "asset", asset)
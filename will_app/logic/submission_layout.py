@@ -0,0 +1,142 @@
+# logic/submission_layout.py
+"""
+Normalized layout of the submission log.
+
+Each will is one row of SUBMISSION_HEADERS. Its beneficiaries and attorneys
+are rows of their own (BENEFICIARY_HEADERS, ATTORNEY_HEADERS) keyed by the
+submission id, one per person actually named - a one-beneficiary will no
+longer carries 200 empty relation{i}/name{i}/dob{i}/share{i} cells. The
+submission store keeps the child rows in its beneficiaries and attorneys
+tables; the exports write them as sheets (or files) of their own.
+
+The legacy wide layout (excel_logger.EXCEL_HEADERS) is rebuilt from the same
+rows by legacy_record(), for the compatibility export only.
+"""
+from helpers.indexed_fields import POA_SLOTS
+from logic.models import ADDRESS_FIELDS
+
+SUBMISSION_HEADERS = [
+    # Personal Information
+    "name", "phone", "email", "gender", "dob", *ADDRESS_FIELDS,
+
+    # Executors
+    "exec1_name", "exec1_relation", "exec1_dob",
+    "include_exec2", "exec2_name", "exec2_relation", "exec2_dob",
+
+    # Wassiyat & Gifts
+    "wassiyat_include", "wassiyat_percentage",
+    "specific_gift_include", "specific_gift_text",
+    "equal_shares",
+
+    # POA choices (the attorneys themselves are in ATTORNEY_HEADERS rows)
+    "include_poa", "second_poa", "include_poa_personal_care", "second_poa_personal_care",
+
+    # Mirror Will
+    "mirror_will", "mirror_will_notes", "mirror_poa", "mirror_poa_care",
+]
+
+BENEFICIARY_HEADERS = ["slot", "relation", "name", "dob", "share"]
+
+# slot 1-4 is the form's POA slot one..four
+ATTORNEY_HEADERS = ["slot", "role", "name", "relation", "dob", *ADDRESS_FIELDS]
+
+ATTORNEY_ROLES = {
+    "one": "POA",
+    "two": "Alternate POA",
+    "three": "Personal Care POA",
+    "four": "Alternate Personal Care POA",
+}
+
+
+def _yes_no(flag):
+    return "yes" if flag else "no"
+
+
+def will_to_rows(will):
+    """
+    (submission record {header: text}, beneficiary rows, attorney rows) for a
+    Will. Child rows are tuples in BENEFICIARY_HEADERS / ATTORNEY_HEADERS order.
+    """
+    applicant = will.applicant
+    record = {
+        "name": applicant.name,
+        "phone": applicant.phone,
+        "email": applicant.email,
+        "gender": applicant.gender,
+        "dob": applicant.dob,
+        "include_exec2": _yes_no(will.include_second_executor),
+        "wassiyat_include": _yes_no(will.wassiyat_include),
+        "wassiyat_percentage": will.wassiyat_percentage,
+        "specific_gift_include": _yes_no(will.specific_gift_include),
+        "specific_gift_text": will.specific_gift_text,
+        "equal_shares": _yes_no(will.equal_shares),
+        "include_poa": _yes_no(will.include_poa),
+        "second_poa": _yes_no(will.second_poa),
+        "include_poa_personal_care": _yes_no(will.include_poa_personal_care),
+        "second_poa_personal_care": _yes_no(will.second_poa_personal_care),
+        "mirror_will": _yes_no(will.mirror_will),
+        "mirror_will_notes": will.mirror_notes,
+        "mirror_poa": _yes_no(will.mirror_poa),
+        "mirror_poa_care": _yes_no(will.mirror_poa_personal_care),
+    }
+    for name in ADDRESS_FIELDS:
+        record[name] = getattr(applicant.address, name)
+
+    for n, executor in enumerate(will.executors, start=1):
+        record[f"exec{n}_name"] = executor.name
+        record[f"exec{n}_relation"] = executor.relation
+        record[f"exec{n}_dob"] = executor.dob
+
+    # Entries with a name or relation are kept, under their form slot
+    beneficiaries = [(b.slot, b.relation, b.name, b.dob, b.share) for b in will.beneficiaries if b.name or b.relation]
+
+    attorneys = []
+    for n, slot in enumerate(POA_SLOTS, start=1):
+        attorney = will.attorneys.get(slot)
+        if attorney is None:
+            continue
+        row = (attorney.name, attorney.relation, attorney.dob,
+               *(getattr(attorney.address, name) for name in ADDRESS_FIELDS))
+        if any(row):
+            attorneys.append((n, ATTORNEY_ROLES[slot], *row))
+
+    return record, beneficiaries, attorneys
+
+
+def legacy_record(record, beneficiaries, attorneys):
+    """The wide spreadsheet record (excel_logger.EXCEL_HEADERS keys) for normalized rows"""
+    legacy = dict(record)
+    for slot, relation, name, dob, share in beneficiaries:
+        legacy[f"relation{slot}"] = relation
+        legacy[f"name{slot}"] = name
+        legacy[f"dob{slot}"] = dob
+        legacy[f"share{slot}"] = share
+    for slot, _, *values in attorneys:
+        suffix = POA_SLOTS[slot - 1]
+        for header, value in zip(ATTORNEY_HEADERS[2:], values):
+            legacy[f"poa_{header}_{suffix}"] = value
+    return legacy
+
+
+def legacy_width_key(header):
+    """Normalized width key that sizes a legacy column: name7 -> beneficiaries.name"""
+    for field in BENEFICIARY_HEADERS[1:]:
+        if header.startswith(field) and header[len(field):].isdigit():
+            return f"beneficiaries.{field}"
+    if header.startswith("poa_"):
+        field, _, slot = header[len("poa_"):].rpartition("_")
+        if slot in POA_SLOTS and field in ATTORNEY_HEADERS:
+            return f"attorneys.{field}"
+    return header
+
+
+def column_widths(record, beneficiaries, attorneys):
+    """{column: longest value} for the running maxima that size export columns"""
+    widths = {h: len(v) for h, v in record.items() if v}
+    for table, headers, rows in (("beneficiaries", BENEFICIARY_HEADERS, beneficiaries),
+                                 ("attorneys", ATTORNEY_HEADERS, attorneys)):
+        for row in rows:
+            for h, v in zip(headers, row):
+                key = f"{table}.{h}"
+                widths[key] = max(widths.get(key, 0), len(str(v)))
+    return widths
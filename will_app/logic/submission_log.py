@@ -0,0 +1,164 @@
+# logic/submission_log.py
+"""
+Single-writer, group-commit logging of submissions.
+
+Request handlers (threads) call append(), which queues the row and waits until
+it is committed. One writer thread per process drains the queue: rows that
+queued up while the previous commit ran (plus any arriving within
+Config.LOG_COMMIT_INTERVAL_MS) are committed together, up to
+Config.LOG_BATCH_SIZE rows per transaction. A burst therefore costs one
+commit per batch instead of one per row, and every append() that returned is
+durable, so at shutdown nothing acknowledged can be lost - shutdown() only
+drains rows whose callers are still waiting.
+
+Writers of different processes (gunicorn workers, batch_generate.py workers)
+take an exclusive lock file next to the database around each commit, so their
+batches are applied one after the other instead of contending for SQLite's
+write lock. Where fcntl is unavailable SQLite's own locking still applies.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from config import Config
+from logic.metrics import observe_stage
+from logic.submission_store import database_path, insert_submissions
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _Writer:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="submission-log-writer", daemon=True)
+        self.thread.start()
+
+    def _collect(self, first):
+        """The first row plus whatever arrives within the commit interval, up to the batch size"""
+        batch = [first]
+        deadline = time.monotonic() + Config.LOG_COMMIT_INTERVAL_MS / 1000
+        stop = False
+        while len(batch) < Config.LOG_BATCH_SIZE:
+            try:
+                item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self):
+        while True:
+            first = self.queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            self._commit(batch)
+            if stop:
+                self._drain()
+                return
+
+    def _drain(self):
+        """Commit rows queued behind the stop marker"""
+        batch = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        if batch:
+            self._commit(batch)
+
+    def _commit(self, batch):
+        started = time.perf_counter()
+        try:
+            with _process_lock():
+                ids = insert_submissions([record for record, _ in batch])
+        except Exception as e:
+            logger.error(f"❌ Submission log commit of {len(batch)} row(s) failed: {str(e)}", exc_info=True)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        observe_stage("log.commit", time.perf_counter() - started)
+        for (_, future), submission_id in zip(batch, ids):
+            future.set_result(submission_id)
+
+    def stop(self, timeout):
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer():
+    global _writer, _writer_pid
+    # A forked child inherits the object but not the thread: start its own
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                _writer = _Writer()
+                _writer_pid = os.getpid()
+    return _writer
+
+
+def _reset_lock_after_fork():
+    global _writer_lock
+    _writer_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+@contextmanager
+def _process_lock():
+    """Exclusive lock shared by every process writing to the same database"""
+    path = database_path()
+    if fcntl is None or path == ":memory:":
+        yield
+        return
+    with open(f"{path}.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def append(form_data, document_path=None, column_widths=None):
+    """Queue one submission for the writer and return its id once it is committed"""
+    future = Future()
+    _get_writer().queue.put(((form_data, document_path, column_widths), future))
+    return future.result()
+
+
+def shutdown(timeout=10):
+    """Commit everything still queued and stop the writer"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = (_writer, None) if _writer_pid == os.getpid() else (None, _writer)
+    if writer and not writer.stop(timeout):
+        logger.warning("Submission log writer did not finish within the shutdown timeout")
+
+
+atexit.register(shutdown)
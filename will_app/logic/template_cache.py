@@ -0,0 +1,145 @@
+# logic/template_cache.py
+"""
+Process-wide cache for universal_will_template.docx.
+
+Parsing the .docx, running docxtpl's patch_xml() regex pass and compiling the
+resulting Jinja source dominate the cost of a render. All three only depend on
+the template file, so they are done once and reused until the file's mtime
+changes. Every render works on its own deep copy of the parsed document.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from copy import deepcopy
+
+from docx import Document
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME = "universal_will_template.docx"
+
+
+def _candidate_paths():
+    return [
+        TEMPLATE_NAME,
+        f"templates/{TEMPLATE_NAME}",
+        os.path.join(os.path.dirname(__file__), f"../{TEMPLATE_NAME}"),
+        os.path.join(os.path.dirname(__file__), f"../templates/{TEMPLATE_NAME}")
+    ]
+
+
+class CachingEnvironment(Environment):
+    """Jinja environment that compiles each distinct template source only once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._compiled = {}
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals or template_class:
+            return super().from_string(source, globals, template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = super().from_string(source)
+            self._compiled[source] = template
+        return template
+
+
+class _TemplateEntry:
+    """Parsed template plus everything derived from it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, "rb") as fh:
+            data = fh.read()
+        self.version = hashlib.sha256(data).hexdigest()[:12]
+        self.document = Document(io.BytesIO(data))
+        self.jinja_env = CachingEnvironment()
+        self.patched = {}
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """DocxTemplate backed by a _TemplateEntry instead of re-reading the file."""
+
+    def __init__(self, entry):
+        super().__init__(entry.path)
+        self._entry = entry
+
+    def init_docx(self, reload=True):
+        if not self.docx or (self.is_rendered and reload):
+            self.docx = deepcopy(self._entry.document)
+            self.is_rendered = False
+
+    def patch_xml(self, src_xml):
+        patched = self._entry.patched.get(src_xml)
+        if patched is None:
+            patched = super().patch_xml(src_xml)
+            self._entry.patched[src_xml] = patched
+        return patched
+
+    def render(self, context, jinja_env=None, autoescape=False):
+        super().render(context, jinja_env or self._entry.jinja_env, autoescape)
+
+
+_entry = None
+_lock = threading.Lock()
+
+
+def _resolve_path():
+    possible_paths = _candidate_paths()
+    template_path = next((p for p in possible_paths if os.path.exists(p)), None)
+    if not template_path:
+        raise FileNotFoundError(f"Template file not found. Checked: {possible_paths}")
+    return template_path
+
+
+def load_template():
+    """
+    Return a fresh CachedDocxTemplate for the will template.
+    The file is only re-parsed when its modification time changes.
+    """
+    global _entry
+    entry = _entry
+    try:
+        if entry and os.path.getmtime(entry.path) == entry.mtime:
+            return CachedDocxTemplate(entry)
+    except OSError:
+        pass
+
+    with _lock:
+        entry = _entry
+        try:
+            stale = not entry or os.path.getmtime(entry.path) != entry.mtime
+        except OSError:
+            stale = True
+        if stale:
+            path = entry.path if entry and os.path.exists(entry.path) else _resolve_path()
+            entry = _TemplateEntry(path)
+            _entry = entry
+            logger.info(f"Loaded will template into cache: {path}")
+    return CachedDocxTemplate(entry)
+
+
+def template_version():
+    """Short content hash of the current template, used to version re-renders."""
+    return load_template()._entry.version
+
+
+def _reset_lock_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+def clear_template_cache():
+    global _entry
+    with _lock:
+        _entry = None
@@ -0,0 +1,69 @@
+# logic/warmup.py
+"""
+Start-up warm-up for serving processes.
+
+The first render in a fresh process pays for parsing the template, docxtpl's
+patch_xml() pass, compiling the Jinja source and importing half of lxml.
+warm_up() does all of that once with a dummy will (and its mirror), rendered
+into a throwaway directory and never indexed, so the first real request is
+not a cold start. Run before forking, the warm caches are shared by every
+worker copy-on-write.
+"""
+import logging
+import os
+import tempfile
+import time
+
+from logic.document import generate_word_document
+from logic.metrics import capture_samples
+from logic.models import Will
+from logic.serializers import will_to_context
+from logic.submission_store import connect
+
+logger = logging.getLogger(__name__)
+
+WARMUP_FORM = {
+    "name": "Warm Up", "gender": "Male", "dob": "1980-01-01",
+    "phone": "416-555-0100", "email": "warmup@example.com",
+    "street_number": "1", "street_name": "Main Street", "city": "Toronto",
+    "regional_municipality": "Toronto", "province": "ON", "postal_code": "M5V 1A1",
+    "exec1_name": "Spouse Warm Up", "exec1_relation": "Wife", "exec1_dob": "1982-02-02",
+    "include_second_executor": True, "exec2_name": "Second Executor", "exec2_relation": "Brother",
+    "exec2_dob": "1985-03-03",
+    "beneficiary_1_name": "Child One", "beneficiary_1_relation": "Son", "beneficiary_1_dob": "2010-04-04",
+    "beneficiary_1_share": "50",
+    "beneficiary_2_name": "Child Two", "beneficiary_2_relation": "Daughter", "beneficiary_2_dob": "2012-05-05",
+    "beneficiary_2_share": "50",
+    "include_poa": True, "poa_name_one": "Spouse Warm Up", "poa_relation_one": "Wife", "poa_dob_one": "1982-02-02",
+    "poa_street_number_one": "1", "poa_street_name_one": "Main Street", "poa_city_one": "Toronto",
+    "poa_province_one": "ON", "poa_postal_code_one": "M5V 1A1",
+    "include_poa_personal_care": True, "poa_name_three": "Second Executor", "poa_relation_three": "Brother",
+    "poa_dob_three": "1985-03-03", "poa_street_number_three": "2", "poa_street_name_three": "King Street",
+    "poa_city_three": "Toronto", "poa_province_three": "ON", "poa_postal_code_three": "M5V 2B2",
+    "mirror_will": True,
+}
+
+
+def warm_up(app=None):
+    """
+    Create the database schema, render the dummy will and mirror once and, given
+    the Flask app, compile its page templates. Returns the seconds it took.
+    """
+    started = time.perf_counter()
+    connect().close()
+
+    will = Will.from_form(WARMUP_FORM)
+    # Stage timings of the warm-up would only skew the latency histograms
+    with capture_samples(), tempfile.TemporaryDirectory(prefix="will_warmup_") as workdir:
+        for name, context in (("will", will_to_context(will)), ("mirror", will_to_context(will.mirrored()))):
+            generate_word_document(context, is_mirror=name == "mirror",
+                                   output_path=os.path.join(workdir, f"{name}.docx"), record=False)
+
+    if app is not None:
+        for name in app.jinja_env.list_templates():
+            if name.endswith(".html"):
+                app.jinja_env.get_template(name)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"🔥 Warm-up finished in {elapsed:.2f}s")
+    return elapsed
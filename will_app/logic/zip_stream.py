@@ -0,0 +1,107 @@
+# logic/zip_stream.py
+"""
+Build a ZIP archive while it is being sent.
+
+zipfile writes into a small in-memory buffer that is drained after every chunk,
+so neither the archive nor any single member is ever held whole in memory or
+staged on disk. The output is not seekable, so entries carry data descriptors.
+"""
+import io
+import time
+import zipfile
+
+CHUNK_SIZE = 64 * 1024
+
+# Already-deflated containers gain nothing from a second compression pass
+STORED_EXTENSIONS = (".docx", ".xlsx", ".zip")
+
+
+class _DrainableBuffer(io.RawIOBase):
+    """Write-only, unseekable sink whose contents are handed off in drain()."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ChunkReader(io.RawIOBase):
+    """Readable over an iterator of str/bytes chunks; each read() returns the next chunk."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        for chunk in self._chunks:
+            if chunk:
+                return chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        return b""
+
+
+class GeneratedMember:
+    """A ZIP entry produced while the archive is sent, from an iterable of str/bytes chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def open(self):
+        return _ChunkReader(iter(self.chunks))
+
+    def zip_info(self, arcname):
+        zinfo = zipfile.ZipInfo(arcname, time.localtime()[:6])
+        zinfo.external_attr = 0o644 << 16
+        return zinfo
+
+
+def iter_zip(entries):
+    """
+    Yield the bytes of a ZIP archive containing `entries`, an iterable of
+    (arcname, source) pairs. A source is a filesystem path or an object with
+    open() and zip_info(arcname), such as document_storage.StoredDocument or
+    GeneratedMember.
+    """
+    sink = _DrainableBuffer()
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as zf:
+        for arcname, source in entries:
+            if isinstance(source, str):
+                zinfo = zipfile.ZipInfo.from_file(source, arcname)
+                opener = lambda source=source: open(source, "rb")
+            else:
+                zinfo = source.zip_info(arcname)
+                opener = source.open
+            if arcname.lower().endswith(STORED_EXTENSIONS):
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+            large = zinfo.file_size > zipfile.ZIP64_LIMIT
+            with opener() as src, zf.open(zinfo, mode="w", force_zip64=large) as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
@@ -0,0 +1,42 @@
+"""
+Generated-document storage maintenance.
+
+Moves documents from the old flat generated_wills/ layout into date shards
+(generated_wills/YYYY/MM/DD/), deletes documents past the retention period,
+packs older months into generated_wills/archive/YYYY-MM.zip and removes stale
+temporary files (interrupted writes, old will_export_* files). Archived
+documents stay listed in the document library and can still be downloaded.
+Limits default to Config (DOCUMENT_RETENTION_DAYS, ARCHIVE_AFTER_MONTHS,
+TEMP_FILE_MAX_AGE); run it daily, e.g. from cron, in the app's working directory.
+
+    python maintain_storage.py
+    python maintain_storage.py --retention-days 3650 --archive-after-months 6
+"""
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shard, archive and expire generated documents")
+    parser.add_argument("--retention-days", type=int, help="delete documents older than this (0 = keep forever)")
+    parser.add_argument("--archive-after-months", type=int, help="archive months older than this (0 = never)")
+    parser.add_argument("--temp-max-age", type=int, help="remove temporary files older than this many seconds")
+    args = parser.parse_args(argv)
+
+    from logic.document_storage import run_maintenance
+
+    started = time.perf_counter()
+    stats = run_maintenance(
+        retention_days=args.retention_days,
+        archive_after_months=args.archive_after_months,
+        temp_max_age=args.temp_max_age,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"📁 Sharded: {stats['sharded']}  🗜 Archived: {stats['archived']}  🗑 Expired: {stats['expired']}  "
+          f"🧹 Temp files: {stats['temp_files']}  ⏱ {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
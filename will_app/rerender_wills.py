@@ -0,0 +1,129 @@
+"""
+Re-render stored submissions against the current will template.
+
+When universal_will_template.docx changes, every affected will can be
+regenerated from the submission store: each stored submission's form data is
+run back through SubmissionService.build_context (build_mirror_context for
+mirror rows) and rendered in a worker pool. New files are written next to the originals with the template version
+in the name (Will_JANE DOE_20250101_120000.v1a2b3c4d5e6f.docx), so originals
+are never overwritten. Progress is recorded per (submission, version), and
+re-running the same command resumes where an interrupted run stopped.
+
+    python rerender_wills.py --start 2025-01-01 --end 2025-06-30 --workers 8
+    python rerender_wills.py --ids 12,13,14
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+COMMIT_EVERY = 100
+
+
+def versioned_path(submission, version):
+    """Output path for a submission's re-render under a template version"""
+    original = submission["document_path"]
+    if original:
+        stem, ext = os.path.splitext(original)
+        return f"{stem}.v{version}{ext or '.docx'}"
+    raw_name = submission["name"] or "Unknown"
+    safe_name = "".join(c for c in raw_name if c.isalnum() or c in (" ", "-", "_")).strip().upper()
+    prefix = "Mirror_" if submission["mirror_will"] else ""
+    from logic.document_storage import shard_path
+    return shard_path(f"{prefix}Will_{safe_name or 'UNKNOWN'}_sub{submission['id']}.v{version}.docx")
+
+
+def _init_worker():
+    from logic.template_cache import load_template
+    load_template()
+
+
+def rerender_one(submission, output_path):
+    """Rebuild one submission's context and render it. Never raises."""
+    from services.submission_service import SubmissionService
+    from logic.document import generate_word_document
+    result = {"submission_id": submission["id"], "status": "done", "output_path": None, "error": None}
+    try:
+        # Each stored row is one document: mirror rows hold the mirror will
+        if submission["mirror_will"]:
+            context = SubmissionService.build_mirror_context(submission["data"])
+        else:
+            context = SubmissionService.build_context(submission["data"])
+        result["output_path"] = generate_word_document(context, is_mirror=bool(submission["mirror_will"]),
+                                                       output_path=output_path)
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    return result
+
+
+def run_rerender(start=None, end=None, ids=None, workers=1, version=None):
+    from logic.submission_store import iter_submissions, completed_rerenders, record_rerenders
+    from logic.template_cache import template_version
+
+    version = version or template_version()
+    already_done = completed_rerenders(version)
+    print(f"🔁 Re-rendering with template version {version} ({len(already_done)} already done)")
+
+    started = time.perf_counter()
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+    pending = []
+    in_flight = set()
+    max_in_flight = workers * 4
+
+    def collect(done):
+        for future in done:
+            r = future.result()
+            counts[r["status"]] += 1
+            pending.append(r)
+            if r["status"] == "failed":
+                print(f"❌ submission {r['submission_id']}: {r['error']}", flush=True)
+        if len(pending) >= COMMIT_EVERY:
+            flush()
+
+    def flush():
+        if pending:
+            record_rerenders(version, pending)
+            pending.clear()
+            finished = counts["done"] + counts["failed"]
+            rate = finished / (time.perf_counter() - started)
+            print(f"… {finished} rendered, {counts['failed']} failed, {rate:.1f}/s", flush=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for submission in iter_submissions(start, end, ids):
+                if submission["id"] in already_done:
+                    counts["skipped"] += 1
+                    continue
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(pool.submit(rerender_one, submission, versioned_path(submission, version)))
+            done, in_flight = wait(in_flight)
+            collect(done)
+    finally:
+        # Whatever finished is recorded, so an interrupted run resumes from here
+        flush()
+
+    elapsed = time.perf_counter() - started
+    print("")
+    print(f"📊 Done: {counts['done']}  ❌ Failed: {counts['failed']}  ⏭ Skipped: {counts['skipped']}  ⏱ {elapsed:.1f}s")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-render stored submissions with the current will template")
+    parser.add_argument("--start", help="first submission date, YYYY-MM-DD")
+    parser.add_argument("--end", help="last submission date, YYYY-MM-DD")
+    parser.add_argument("--ids", help="comma-separated submission ids")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--version", help="version label (default: template content hash)")
+    args = parser.parse_args(argv)
+
+    ids = [int(i) for i in args.ids.split(",") if i.strip()] if args.ids else None
+    counts = run_rerender(args.start, args.end, ids, max(args.workers, 1), args.version)
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,15 @@
-from flask import Blueprint, send_file, request, session, redirect, url_for, jsonify
-import os
-import openpyxl
+from flask import Blueprint, Response, send_file, request, session, redirect, url_for, jsonify, stream_with_context
 from datetime import datetime, date
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, PatternFill, Alignment
+from urllib.parse import urlencode
+from markupsafe import escape
+from helpers.validators import validate_date
+from logic.excel_logger import iter_xlsx_export, iter_csv_export, iter_jsonl_export
+from logic.excel_logger import iter_legacy_xlsx_export, iter_legacy_csv_export, iter_legacy_jsonl_export
+from logic.submission_store import count_submissions, get_counters, find_documents, DOCUMENT_SORTS
+from logic.submission_store import iter_document_filenames, search_submissions
+from logic.document_storage import find_stored_document, delete_documents
+from logic.zip_stream import iter_zip
+from logic.metrics import stage_percentiles
 
 # ============================================================
 # 📁 SETUP
@@ -63,25 +69,26 @@ def admin_logout():
 # 📊 DASHBOARD
 # ============================================================
 def get_submission_stats():
-    excel_file = "will_data_log.xlsx"
-    stats = {"total": 0, "today": 0, "docs": 0}
-    if os.path.exists(excel_file):
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-        stats["total"] = max(ws.max_row - 1, 0)
-        today = date.today().strftime("%Y-%m-%d")
-        stats["today"] = sum(1 for r in ws.iter_rows(min_row=2, values_only=True)
-                             if today in str(r[0]))
-    folder = "generated_wills"
-    if os.path.exists(folder):
-        stats["docs"] = len([f for f in os.listdir(folder) if f.endswith(".docx")])
-    return stats
+    counters = get_counters(date.today().strftime("%Y-%m-%d"))
+    total, today = counters["total"], counters["day"]
+    return {
+        "total": total.get("submissions", 0),
+        "today": today.get("submissions", 0),
+        "docs": total.get("documents", 0),
+        "mirror": total.get("mirror_wills", 0),
+        "poa": total.get("poa", 0)
+    }
 
 
 @admin_bp.route('/')
 @admin_required
 def admin_dashboard():
     s = get_submission_stats()
+    latency_rows = "".join(
+        f"<tr><td>{escape(stage)}</td><td>{p['count']}</td><td>{p['p50']:.1f}</td>"
+        f"<td>{p['p95']:.1f}</td><td>{p['p99']:.1f}</td></tr>"
+        for stage, p in stage_percentiles().items()
+    ) or "<tr><td colspan='5' class='empty'>No submissions timed since the last restart.</td></tr>"
     return f"""
     <html><head><title>Admin Dashboard</title></head>
     <body style="margin:0;font-family:'Segoe UI';background:linear-gradient(135deg,#f0f9ff,#e0f2fe);
@@ -96,12 +103,24 @@ def admin_dashboard():
           <div class='card'><div>{s['total']}</div><span>Total Submissions</span></div>
           <div class='card'><div>{s['today']}</div><span>Today</span></div>
           <div class='card'><div>{s['docs']}</div><span>Documents</span></div>
+          <div class='card'><div>{s['mirror']}</div><span>Mirror Wills</span></div>
+          <div class='card'><div>{s['poa']}</div><span>With POA</span></div>
         </section>
         <nav style='margin-top:45px;display:flex;flex-wrap:wrap;gap:20px;'>
           <a href='/admin/documents' class='btn'>📂 Document Library</a>
+          <a href='/admin/search' class='btn'>🔎 Find a Client</a>
           <a href='/admin/export' class='btn'>📊 Export Data</a>
+          <a href='/admin/export?format=csv' class='btn'>📄 Export CSV</a>
+          <a href='/admin/export?layout=legacy' class='btn gray'>🗄 Legacy Layout Export</a>
           <a href='/' class='btn gray'>🏠 Return Home</a>
         </nav>
+        <section class='latency'>
+          <h3>⏱ Stage Latency (recent, ms)</h3>
+          <table>
+            <tr><th>Stage</th><th>Count</th><th>p50</th><th>p95</th><th>p99</th></tr>
+            {latency_rows}
+          </table>
+        </section>
       </div>
       <style>
         @keyframes fade{{from{{opacity:0;transform:translateY(8px);}}to{{opacity:1;}}}}
@@ -115,6 +134,14 @@ def admin_dashboard():
           font-weight:600;box-shadow:0 5px 15px rgba(37,99,235,0.35);transition:.25s;}}
         .btn:hover{{transform:translateY(-3px);filter:brightness(1.1);}}
         .gray{{background:#475569;}}
+        .latency{{margin-top:45px;background:white;padding:25px;border-radius:12px;
+          box-shadow:0 3px 20px rgba(0,0,0,0.08);}}
+        .latency h3{{color:#1e3a8a;margin:0 0 15px;}}
+        .latency table{{width:100%;border-collapse:collapse;}}
+        .latency th,.latency td{{padding:8px 10px;border-bottom:1px solid #e5e7eb;text-align:right;}}
+        .latency th:first-child,.latency td:first-child{{text-align:left;}}
+        .latency th{{color:#475569;}}
+        .latency .empty{{text-align:center;color:#6b7280;}}
       </style>
     </body></html>
     """
@@ -126,20 +153,23 @@ def admin_dashboard():
 @admin_bp.route('/documents')
 @admin_required
 def list_documents():
-    folder = "generated_wills"
-    docs = []
-    if os.path.exists(folder):
-        for f in os.listdir(folder):
-            if f.endswith(".docx"):
-                docs.append({
-                    "name": f,
-                    "created": datetime.fromtimestamp(os.path.getctime(os.path.join(folder, f))).strftime("%Y-%m-%d %H:%M:%S")
-                })
-    docs.sort(key=lambda x: x["created"], reverse=True)
+    try:
+        docs, next_cursor, params = _document_page()
+    except ValueError as e:
+        return f"<h3 style='color:#e11d48;text-align:center;'>{escape(str(e))}</h3>", 400
+
     rows = "".join(
-        f"<div class='row fade'><input type='checkbox' value='{d['name']}' class='chk'>"
-        f"<span>{d['name']}</span><small>{d['created']}</small></div>"
+        f"<div class='row fade'><input type='checkbox' value='{escape(d['filename'])}' class='chk'>"
+        f"<span>{escape(d['filename'])}</span>{'<em>Mirror</em>' if d['is_mirror'] else ''}"
+        f"<small>{d['created_at']}</small></div>"
         for d in docs) or "<p class='empty'>No documents yet.</p>"
+    more = ""
+    if next_cursor:
+        more = (f"<a class='more' href='/admin/documents?"
+                f"{escape(urlencode({**params, 'cursor': next_cursor}))}'>Next page →</a>")
+    sort_options = "".join(
+        f"<option value='{s}'{' selected' if s == params['sort'] else ''}>{s.title()}</option>"
+        for s in DOCUMENT_SORTS)
     return f"""
     <html><head><title>Documents</title></head>
     <body style="margin:0;font-family:'Segoe UI';background:linear-gradient(135deg,#f0f9ff,#e0f2fe);
@@ -149,6 +179,11 @@ def list_documents():
           <h2 style='color:#1e3a8a;'>📂 Document Library</h2>
           <a href='/admin' style='text-decoration:none;color:#2563eb;font-weight:600;'>← Back</a>
         </header>
+        <form class='toolbar' method='GET' action='/admin/documents'>
+          <input name='q' value='{escape(params['q'])}' placeholder='Search client or file name…'>
+          <select name='sort'>{sort_options}</select>
+          <button>🔍 Search</button>
+        </form>
         <div class='toolbar'>
           <label><input type='checkbox' id='selectAll' onchange='toggleAll()'> Select All</label>
           <div>
@@ -157,6 +192,7 @@ def list_documents():
           </div>
         </div>
         <section class='list'>{rows}</section>
+        {more}
       </div>
       <style>
         @keyframes fade{{from{{opacity:0;transform:translateY(8px);}}to{{opacity:1;}}}}
@@ -173,6 +209,10 @@ def list_documents():
           border-bottom:1px solid #e5e7eb;padding:8px 0;transition:.25s;}}
         .row:hover{{background:#f1f5f9;transform:translateX(3px);}}
         .row span{{flex:1;color:#1e3a8a;font-weight:600;margin-left:10px;}}
+        .row em{{color:#7c3aed;font-style:normal;font-weight:600;margin-right:12px;}}
+        .toolbar input[name=q]{{flex:1;padding:9px;border-radius:8px;border:1px solid #cbd5e1;}}
+        .toolbar select{{margin-left:8px;padding:9px;border-radius:8px;border:1px solid #cbd5e1;}}
+        .more{{display:block;text-align:center;margin-top:16px;color:#2563eb;font-weight:600;text-decoration:none;}}
         .empty{{text-align:center;color:#6b7280;padding:40px;}}
         .fade{{animation:fade .5s ease-in;}}
       </style>
@@ -192,29 +232,152 @@ def list_documents():
         function downloadSel() {{
           const f=[...document.querySelectorAll('.chk:checked')].map(c=>c.value);
           if(!f.length) return alert('Select files first');
-          f.forEach(v=>window.open('/admin/download/'+encodeURIComponent(v),'_blank'));
+          if(f.length===1) return window.open('/admin/download/'+encodeURIComponent(f[0]),'_blank');
+          const form=document.createElement('form');form.method='POST';form.action='/admin/download-zip';
+          f.forEach(v=>{{const i=document.createElement('input');i.type='hidden';i.name='files';i.value=v;form.appendChild(i);}});
+          document.body.appendChild(form);form.submit();form.remove();
         }}
       </script>
     </body></html>
     """
 
 
+def _document_page():
+    """Read library paging/search params and fetch one page from the document index"""
+    params = {
+        "q": request.args.get("q", "").strip(),
+        "sort": request.args.get("sort", "newest"),
+    }
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+    docs, next_cursor = find_documents(
+        limit=limit,
+        cursor=request.args.get("cursor") or None,
+        sort=params["sort"],
+        prefix=params["q"] or None,
+    )
+    return docs, next_cursor, params
+
+
+@admin_bp.route('/api/documents')
+@admin_required
+def api_documents():
+    """JSON view of the document library: ?q=&sort=newest|oldest|name&limit=&cursor="""
+    try:
+        docs, next_cursor, _ = _document_page()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, "documents": docs, "next_cursor": next_cursor})
+
+
+# ============================================================
+# 🔎 SUBMISSION SEARCH
+# ============================================================
+def _search_page():
+    """Read search params and fetch one page of matching submissions"""
+    q = request.args.get("q", "").strip()
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    results, next_before = search_submissions(q, limit=limit, before=request.args.get("before", type=int))
+    return q, results, next_before
+
+
+@admin_bp.route('/search')
+@admin_required
+def search_page():
+    """Find submissions by any name, address, email or phone number; links to their documents"""
+    try:
+        q, results, next_before = _search_page()
+    except ValueError as e:
+        return f"<h3 style='color:#e11d48;text-align:center;'>{escape(str(e))}</h3>", 400
+
+    def doc_links(docs):
+        return "".join(
+            f"<div><a href='/admin/download/{escape(d['filename'])}' title='Download'>"
+            f"{'🪞' if d['is_mirror'] else '📄'} {escape(d['filename'])}</a>"
+            f"<a class='lib' href='/admin/documents?{escape(urlencode({'q': d['filename']}))}'>library</a></div>"
+            for d in docs) or "<small>No document on file</small>"
+
+    rows = "".join(
+        f"<div class='row fade'><div><strong>{escape(r['name'])}</strong>"
+        f"{'<em>Mirror</em>' if r['mirror_will'] else ''}<small>#{r['id']} · {r['created_at']}</small></div>"
+        f"<div class='docs'>{doc_links(r['documents'])}</div></div>"
+        for r in results)
+    if not rows:
+        rows = f"<p class='empty'>{'No matching submissions.' if q else 'Type a name, address, email or phone number.'}</p>"
+    more = ""
+    if next_before:
+        more = (f"<a class='more' href='/admin/search?"
+                f"{escape(urlencode({'q': q, 'before': next_before}))}'>Older matches →</a>")
+    return f"""
+    <html><head><title>Find a Client</title></head>
+    <body style="margin:0;font-family:'Segoe UI';background:linear-gradient(135deg,#f0f9ff,#e0f2fe);
+    animation:fade .6s;">
+      <div style='max-width:950px;margin:60px auto;padding:0 25px;'>
+        <header style='display:flex;justify-content:space-between;align-items:center;margin-bottom:30px;'>
+          <h2 style='color:#1e3a8a;'>🔎 Find a Client</h2>
+          <a href='/admin' style='text-decoration:none;color:#2563eb;font-weight:600;'>← Back</a>
+        </header>
+        <form class='toolbar' method='GET' action='/admin/search'>
+          <input name='q' value='{escape(q)}' autofocus
+            placeholder='Name, executor, beneficiary, attorney, address, email or phone…'>
+          <button>🔍 Search</button>
+        </form>
+        <section class='list'>{rows}</section>
+        {more}
+      </div>
+      <style>
+        @keyframes fade{{from{{opacity:0;transform:translateY(8px);}}to{{opacity:1;}}}}
+        .toolbar{{display:flex;align-items:center;background:white;padding:14px 20px;border-radius:10px;
+          box-shadow:0 3px 20px rgba(0,0,0,0.08);margin-bottom:18px;}}
+        .toolbar input{{flex:1;padding:9px;border-radius:8px;border:1px solid #cbd5e1;}}
+        .toolbar button{{background:#2563eb;color:white;border:none;padding:10px 14px;
+          border-radius:8px;font-weight:600;margin-left:8px;cursor:pointer;transition:.25s;}}
+        .list{{background:white;border-radius:10px;box-shadow:0 3px 20px rgba(0,0,0,0.07);
+          padding:12px 18px;}}
+        .row{{display:flex;justify-content:space-between;gap:20px;border-bottom:1px solid #e5e7eb;padding:10px 0;}}
+        .row strong{{color:#1e3a8a;}}
+        .row em{{color:#7c3aed;font-style:normal;font-weight:600;margin-left:10px;}}
+        .row small{{display:block;color:#6b7280;margin-top:3px;}}
+        .docs{{text-align:right;}}
+        .docs a{{color:#2563eb;text-decoration:none;font-weight:600;}}
+        .docs a.lib{{color:#6b7280;font-weight:400;font-size:.85em;margin-left:8px;}}
+        .more{{display:block;text-align:center;margin-top:16px;color:#2563eb;font-weight:600;text-decoration:none;}}
+        .empty{{text-align:center;color:#6b7280;padding:40px;}}
+        .fade{{animation:fade .5s ease-in;}}
+      </style>
+    </body></html>
+    """
+
+
+@admin_bp.route('/api/search')
+@admin_required
+def api_search():
+    """JSON submission search: ?q=&limit=&before="""
+    try:
+        _, results, next_before = _search_page()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, "submissions": results, "next_before": next_before})
+
+
 # ============================================================
 # 🗑 DELETE FILES
 # ============================================================
+def _file_selection(files):
+    """The file names in a JSON 'files' value (entries that are not strings are skipped); None unless it is a list"""
+    if not isinstance(files, list):
+        return None
+    return [f for f in files if isinstance(f, str)]
+
+
 @admin_bp.route('/delete-files', methods=['POST'])
 @admin_required
 def delete_files():
-    data = request.get_json()
-    files = data.get('files', [])
-    folder = "generated_wills"
-    count = 0
-    for f in files:
-        p = os.path.join(folder, f)
-        if os.path.exists(p):
-            os.remove(p)
-            count += 1
-    return jsonify({"message": f"Deleted {count} file(s)."})
+    data = request.get_json(silent=True)
+    files = _file_selection(data.get('files', []) if isinstance(data, dict) else None)
+    if files is None:
+        return jsonify({"success": False, "error": "Expected a JSON object with a 'files' list"}), 400
+    removed = delete_documents(files)
+    return jsonify({"message": f"Deleted {len(removed)} file(s)."})
 
 
 # ============================================================
@@ -223,48 +386,112 @@ def delete_files():
 @admin_bp.route('/download/<filename>')
 @admin_required
 def download_file(filename):
-    path = os.path.join("generated_wills", filename)
-    if os.path.exists(path):
-        return send_file(path, as_attachment=True)
+    doc = find_stored_document(filename)
+    if doc:
+        return send_file(doc.open(), as_attachment=True, download_name=filename)
     return "<h3 style='color:#e11d48;text-align:center;'>File not found.</h3>", 404
 
 
 # ============================================================
-# 📦 EXPORT DATA (Styled & Professional)
+# 🗜 BULK DOWNLOAD (streamed ZIP)
 # ============================================================
+def _invalid_date(*values):
+    """Escaped 400 message for the first value that is not YYYY-MM-DD; None when all are valid (or empty)"""
+    for value in values:
+        if value and not validate_date(value):
+            return f"Invalid date (expected YYYY-MM-DD): {escape(value)}"
+    return None
+
+
+@admin_bp.route('/download-zip', methods=['GET', 'POST'])
+@admin_required
+def download_zip():
+    """
+    Stream selected documents as one ZIP.
+    Selection: 'files' (JSON list or repeated form field), or start/end=YYYY-MM-DD.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return "Expected a JSON object", 400
+    if 'files' in data:
+        files = _file_selection(data['files'])
+        if files is None:
+            return "'files' must be a list of file names", 400
+    else:
+        files = request.form.getlist('files')
+    start = data.get('start') or request.values.get('start') or None
+    end = data.get('end') or request.values.get('end') or None
+
+    if not files:
+        error = _invalid_date(start, end)
+        if error:
+            return error, 400
+        if not (start or end):
+            return "Select files or a date range", 400
+        files = iter_document_filenames(start, end)
+
+    def entries():
+        seen = set()
+        for f in files:
+            if f in seen:
+                continue
+            seen.add(f)
+            # Plain filenames only (find_stored_document never follows paths); archived documents included
+            doc = find_stored_document(f)
+            if doc:
+                yield f, doc
+
+    archive_name = f"wills_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(
+        stream_with_context(iter_zip(entries())),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={archive_name}"}
+    )
+
+
+# ============================================================
+# 📦 EXPORT DATA (Styled & Professional, streamed)
+# ============================================================
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# (format, layout) -> (generator, mimetype, file extension). The normalized layout has one
+# row per will plus beneficiary and attorney rows; 'legacy' is the old 200-column wide sheet.
+EXPORT_FORMATS = {
+    ("xlsx", "normalized"): (iter_xlsx_export, XLSX_MIMETYPE, "xlsx"),
+    ("csv", "normalized"): (iter_csv_export, "application/zip", "zip"),
+    ("jsonl", "normalized"): (iter_jsonl_export, "application/x-ndjson", "jsonl"),
+    ("xlsx", "legacy"): (iter_legacy_xlsx_export, XLSX_MIMETYPE, "xlsx"),
+    ("csv", "legacy"): (iter_legacy_csv_export, "text/csv", "csv"),
+    ("jsonl", "legacy"): (iter_legacy_jsonl_export, "application/x-ndjson", "jsonl"),
+}
+
+
 @admin_bp.route('/export')
 @admin_required
 def export_data():
-    excel_file = "will_data_log.xlsx"
-    if not os.path.exists(excel_file):
+    """
+    Stream the submission log.
+    Query: format=xlsx|csv|jsonl, layout=normalized|legacy, start/end=YYYY-MM-DD
+    """
+    fmt = request.args.get('format', 'xlsx').lower()
+    layout = request.args.get('layout', 'normalized').lower()
+    if (fmt, layout) not in EXPORT_FORMATS:
+        return f"Unsupported export: format={escape(fmt)} layout={escape(layout)}", 400
+
+    start = request.args.get('start') or None
+    end = request.args.get('end') or None
+    error = _invalid_date(start, end)
+    if error:
+        return error, 400
+
+    if not count_submissions():
         return "No data to export", 404
 
-    try:
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-
-        # 🟦 Header Styling
-        header_fill = PatternFill(start_color="1E3A8A", end_color="1E3A8A", fill_type="solid")
-        header_font = Font(color="FFFFFF", bold=True)
-        header_alignment = Alignment(horizontal="center", vertical="center")
-
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-
-        # 🧊 Freeze top row
-        ws.freeze_panes = "A2"
-
-        # 🔠 Auto-fit columns width
-        for column_cells in ws.columns:
-            length = max(len(str(cell.value)) if cell.value else 0 for cell in column_cells)
-            ws.column_dimensions[get_column_letter(column_cells[0].column)].width = min(max(length + 4, 12), 60)
-
-        # 💾 Save styled export
-        export_filename = f"will_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        wb.save(export_filename)
-        return send_file(export_filename, as_attachment=True)
-
-    except Exception as e:
-        return f"Error exporting data: {e}", 500
+    generator, mimetype, extension = EXPORT_FORMATS[(fmt, layout)]
+    suffix = "_legacy" if layout == "legacy" else ""
+    export_filename = f"will_export{suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(
+        stream_with_context(generator(start, end)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={export_filename}"}
+    )
@@ -0,0 +1,192 @@
+from flask import Blueprint, Response, g, request, jsonify, send_file, stream_with_context
+import hashlib
+import hmac
+import json
+import os
+from itertools import chain
+from config import Config
+from services.submission_service import SubmissionService, SubmissionInProgressError, IdempotencyKeyReusedError
+from logic.metrics import stage_timer
+from logic.zip_stream import iter_zip
+from logic.document_storage import find_stored_document
+
+# ============================================================
+# 📁 SETUP
+# ============================================================
+# Stateless partner API: a whole will per request, no cookies, no session.
+# Payloads use the web form's field names (name, exec1_name,
+# beneficiary_1_name, poa_name_one, ...).
+api_bp = Blueprint('api', __name__)
+
+
+# ============================================================
+# 🔐 AUTHENTICATION
+# ============================================================
+def api_key_required(f):
+    def wrapper(*args, **kwargs):
+        if not Config.API_KEYS:
+            return jsonify({"success": False, "error": "API is not enabled"}), 503
+        key = request.headers.get("X-API-Key", "")
+        if not any(hmac.compare_digest(key, k) for k in Config.API_KEYS):
+            return jsonify({"success": False, "error": "Invalid API key"}), 401
+        # Scopes idempotency keys per partner without storing the API key itself
+        g.api_client = hashlib.sha256(key.encode()).hexdigest()[:16]
+        return f(*args, **kwargs)
+    wrapper.__name__ = f.__name__
+    return wrapper
+
+
+def _document_id(path):
+    return os.path.basename(path) if path else None
+
+
+def _generate(form_data, idempotency_key=None):
+    """
+    Validate and generate one will. Never raises; returns
+    (HTTP status, result) where result always carries "status".
+    Repeats of an idempotency key (per API key) get the first result without
+    generating again; reusing a key for a different body is a 422.
+    """
+    if not isinstance(form_data, dict):
+        return 400, {"success": False, "status": "invalid", "error": "Expected a JSON object",
+                     "errors": ["Expected a JSON object"]}
+    try:
+        with stage_timer("submit.validate"):
+            validation = SubmissionService.validate(form_data)
+        if not validation["success"]:
+            return 400, {"success": False, "status": "invalid", "error": validation["error"],
+                         "errors": validation["errors"]}
+
+        def submit():
+            with stage_timer("submit.build_context"):
+                base_context = SubmissionService.build_context(form_data)
+            with stage_timer("submit.generate"):
+                return SubmissionService.generate_documents(form_data, base_context)
+
+        if idempotency_key:
+            body = json.dumps(form_data, sort_keys=True, default=str).encode()
+            result = SubmissionService.run_once(f"api:{g.api_client}:{idempotency_key}", submit,
+                                                request_hash=hashlib.sha256(body).hexdigest())
+        else:
+            result = submit()
+    except SubmissionInProgressError as e:
+        return 409, {"success": False, "status": "failed", "error": str(e)}
+    except IdempotencyKeyReusedError as e:
+        return 422, {"success": False, "status": "invalid", "error": str(e), "errors": [str(e)]}
+    except Exception as e:
+        return 500, {"success": False, "status": "failed", "error": f"System error: {str(e)}"}
+
+    return 200, {
+        "success": True,
+        "status": "ok",
+        "message": result["message"],
+        "document_id": _document_id(result["document_path"]),
+        "mirror_id": _document_id(result["mirror_path"]),
+    }
+
+
+# ============================================================
+# 📝 SINGLE WILL
+# ============================================================
+@api_bp.route('/wills', methods=['POST'])
+@api_key_required
+def create_will():
+    """
+    Generate one will (and its mirror, if requested) from a complete JSON payload.
+    Returns the document ids; with ?download=1 the documents themselves
+    (the .docx, or a ZIP when a mirror will was created too; 410 with the ids
+    when they have been deleted since).
+    An Idempotency-Key header makes retries of the same request safe.
+    """
+    form_data = request.get_json(silent=True)
+    status, result = _generate(form_data, request.headers.get("Idempotency-Key"))
+    if status != 200 or request.args.get("download") not in ("1", "true", "yes"):
+        return jsonify(result), status
+
+    # A replayed request may name documents that retention has removed since
+    docs = [find_stored_document(result[key]) for key in ("document_id", "mirror_id") if result[key]]
+    docs = [doc for doc in docs if doc is not None]
+    if not docs:
+        return jsonify({**result, "success": False, "error": "Document is no longer available"}), 410
+    if len(docs) == 1:
+        return send_file(docs[0].open(), as_attachment=True, download_name=docs[0].filename)
+    name, _ = os.path.splitext(result["document_id"])
+    return Response(
+        iter_zip((doc.filename, doc) for doc in docs),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={name}.zip"}
+    )
+
+
+# ============================================================
+# 📚 BULK
+# ============================================================
+# End of the bulk input; None is a payload (an unreadable NDJSON line)
+_END = object()
+
+
+def _iter_bulk_payloads():
+    """
+    Wills from the request body: a JSON list, {"wills": [...]}, or
+    NDJSON (one will per line, read as it arrives).
+    """
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        for line in request.stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+        return
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("wills")
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON list of wills, {"wills": [...]}, or NDJSON')
+    yield from data
+
+
+@api_bp.route('/wills/bulk', methods=['POST'])
+@api_key_required
+def create_wills_bulk():
+    """
+    Generate many wills in one request. The response is NDJSON, one line per
+    will in input order, written as each finishes, then a summary line.
+    """
+    payloads = _iter_bulk_payloads()
+    # Reject a malformed body before the streamed response starts
+    try:
+        first = next(payloads, _END)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if first is _END:
+        return jsonify({"success": False, "error": "No wills in request"}), 400
+
+    def results():
+        counts = {"ok": 0, "invalid": 0, "failed": 0}
+        for index, form_data in enumerate(chain([first], payloads)):
+            if index >= Config.API_BULK_LIMIT:
+                counts["failed"] += 1
+                yield json.dumps({"index": index, "success": False, "status": "failed",
+                                  "error": f"Bulk limit of {Config.API_BULK_LIMIT} wills reached"}) + "\n"
+                break
+            _, result = _generate(form_data)
+            counts[result["status"]] += 1
+            yield json.dumps({"index": index, **result}) + "\n"
+        yield json.dumps({"summary": {"total": sum(counts.values()), **counts}}) + "\n"
+
+    return Response(stream_with_context(results()), mimetype="application/x-ndjson")
+
+
+# ============================================================
+# ⬇️ DOCUMENTS
+# ============================================================
+@api_bp.route('/documents/<document_id>')
+@api_key_required
+def download_document(document_id):
+    """Fetch a generated document by the id returned from /api/wills"""
+    doc = find_stored_document(document_id)
+    if doc is None:
+        return jsonify({"success": False, "error": "Unknown document"}), 404
+    return send_file(doc.open(), as_attachment=True, download_name=document_id)
@@ -1,11 +1,42 @@
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, Response, current_app, render_template, request, jsonify, session
+import hashlib
 import uuid
 from services.step_service import StepService
-from helpers.formatters import format_date, title_case, safe_bool
-from logic.document import generate_word_document, generate_mirror_will  # ADDED IMPORT
+from services.submission_service import SubmissionService, SubmissionInProgressError
+from services.job_service import JobService, QueueFullError
+from logic.metrics import stage_timer
+from helpers.validation_schema import browser_schema
 
 form_steps_bp = Blueprint('form_steps', __name__)
 
+STEP_TEMPLATES = {
+    1: 'step1_personal.html',
+    2: 'step2_executors.html',
+    3: 'step3_beneficiaries.html',
+    4: 'step4_poa.html',
+    5: 'step5_review.html'
+}
+
+# Rendered step pages: {template name: (template, body, etag)}. The pages hold no
+# per-user data (the form is filled in client-side), so one render per template
+# version serves everyone; a reloaded template is a new object and re-renders.
+_page_cache = {}
+
+# Browsers may keep these but must revalidate - the ETag turns that into a 304
+REVALIDATE = 'private, no-cache'
+
+
+@form_steps_bp.context_processor
+def inject_validation_schema():
+    """Step pages embed the validation rules so static/js/validation.js can check steps before posting"""
+    return {'validation_schema': browser_schema()}
+
+
+@form_steps_bp.route('/validation-schema.json')
+def validation_schema():
+    """The step validation rules as JSON"""
+    return jsonify(browser_schema())
+
 
 @form_steps_bp.route('/')
 def form_home():
@@ -26,17 +57,25 @@ def show_step(step_number):
     if step_number < 1 or step_number > 5:
         step_number = 1
 
-    session['current_step'] = step_number
+    # The progress bar reads current_step, so a page's output depends only on its step
+    if session.get('current_step') != step_number:
+        session['current_step'] = step_number
 
-    templates = {
-        1: 'step1_personal.html',
-        2: 'step2_executors.html',
-        3: 'step3_beneficiaries.html',
-        4: 'step4_poa.html',
-        5: 'step5_review.html'
-    }
+    _, body, etag = _render_step_page(f"form_steps/{STEP_TEMPLATES[step_number]}")
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = REVALIDATE
+    return response.make_conditional(request)
 
-    return render_template(f"form_steps/{templates.get(step_number)}")
+
+def _render_step_page(name):
+    """Rendered page for a step template, from the cache while the template is unchanged"""
+    template = current_app.jinja_env.get_template(name)
+    cached = _page_cache.get(name)
+    if cached is None or cached[0] is not template:
+        body = render_template(template).encode('utf-8')
+        cached = _page_cache[name] = (template, body, hashlib.sha256(body).hexdigest()[:32])
+    return cached
 
 
 @form_steps_bp.route('/save-step/<int:step_number>', methods=['POST'])
@@ -46,7 +85,7 @@ def save_step(step_number):
         step_data = request.get_json()
         result = StepService.validate_step(step_number, step_data)
         if not result['success']:
-            return jsonify({'success': False, 'error': result['error']}), 400
+            return jsonify({'success': False, 'error': result['error'], 'errors': result['errors']}), 400
 
         StepService.save_step_data(step_number, step_data, session)
         return jsonify({'success': True, 'next_step': step_number + 1 if step_number < 5 else 'complete'})
@@ -56,8 +95,38 @@ def save_step(step_number):
 
 @form_steps_bp.route('/get-form-data')
 def get_form_data():
-    """Return session form data"""
-    return jsonify({'success': True, 'form_data': session.get('form_data', {})})
+    """Return session form data; a client holding the current revision gets a 304"""
+    form_id = session.get('form_id')
+    if not form_id:
+        return jsonify({'success': True, 'form_data': session.get('form_data', {})})
+
+    # save_step_data() bumps form_revision on every change to the draft
+    etag = f"{form_id}.{session.get('form_revision', 0)}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify({'success': True, 'form_data': session.get('form_data', {})})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = REVALIDATE
+    return response
+
+
+def _clear_submitted_form(key):
+    """Drop the submitted draft, remembering its idempotency key for late retries"""
+    session.clear()
+    if key:
+        session['submitted_key'] = key
+
+
+def _finished_submission(prefix):
+    """
+    Result of this session's last submission when the draft is already gone
+    (a double-click or retry that arrived after the first submit finished).
+    """
+    key = session.get('submitted_key')
+    if key and key.startswith(prefix) and 'form_id' not in session:
+        return SubmissionService.finished_result(key)
+    return None
 
 
 @form_steps_bp.route('/submit-complete-form', methods=['POST'])
@@ -69,123 +138,101 @@ def submit_complete_form():
     - Validates spouse relationship before mirror generation
     """
     try:
+        # A retry arriving after the first submit cleared the draft gets its result
+        finished = _finished_submission("submit:")
+        if finished is not None:
+            return jsonify(finished)
+
         form_data = session.get('form_data', {}) or {}
         final_data = request.get_json() or {}
         form_data.update(final_data)
 
         # Step 1: Validation
-        from helpers.validators import validate_form_data
-        validation = validate_form_data(form_data)
+        with stage_timer("submit.validate"):
+            validation = SubmissionService.validate(form_data)
         if not validation["success"]:
             return jsonify({"success": False, "error": validation["error"]}), 400
 
-        # Step 2: Import all logic handlers
-        from logic.poa import process_poa_data
-        from logic.executor import process_executor_data
-        from logic.beneficiaries import process_beneficiaries_data
-        from logic.excel_logger import log_to_excel
-
-        # Step 3: Context assembly - UPDATED FOR UPPERCASE
-        poa_context = process_poa_data(form_data)
-        executor_context = process_executor_data(form_data)
-        beneficiaries_context = process_beneficiaries_data(form_data)
-
-        # FIXED: Use the SAME format_address function that document.py uses
-        # Import the function from document.py to ensure consistency
-        from logic.document import format_address as document_format_address
-        
-        # Personal address (fully formatted) - USING DOCUMENT.PY FUNCTION
-        personal_address = document_format_address(
-            form_data.get('street_number', ''),
-            form_data.get('street_name', ''),
-            form_data.get('city', ''),
-            form_data.get('regional_municipality', ''),
-            form_data.get('province', ''),
-            form_data.get('postal_code', '')
-        )
-
-        # UPDATED: Base context with ALL necessary fields for template
-        base_context = {
-            **poa_context,
-            **executor_context,
-            **beneficiaries_context,
-            # Personal Information
-            "name": form_data.get("name", ""),
-            "gender": form_data.get("gender", ""),
-            "dob": format_date(form_data.get("dob", "")),
-            "address": personal_address,  # Using 'address' for template compatibility
-            "full_address": personal_address,  # Alias for template
-            "city": form_data.get("city", ""),
-            "regional_municipality": form_data.get("regional_municipality", ""),
-            # Address components for mirror will swapping
-            "street_number": form_data.get("street_number", ""),
-            "street_name": form_data.get("street_name", ""),
-            "province": form_data.get("province", ""),
-            "postal_code": form_data.get("postal_code", ""),
-            # Executor fields for mirror will
-            "executor_name_one": form_data.get("exec1_name", ""),
-            "relation_executor_one": form_data.get("exec1_relation", ""),
-            "executor_dob_one": format_date(form_data.get("exec1_dob", "")),
-            # Additional executor address fields if available
-            "exec1_street_number": form_data.get("exec1_street_number", ""),
-            "exec1_street_name": form_data.get("exec1_street_name", ""),
-            "exec1_city": form_data.get("exec1_city", ""),
-            "exec1_regional_municipality": form_data.get("exec1_regional_municipality", ""),
-            "exec1_province": form_data.get("exec1_province", ""),
-            "exec1_postal_code": form_data.get("exec1_postal_code", ""),
-            # Pronouns
-            "pronoun": "his" if form_data.get("gender", "").lower() == "male" else "her",
-            # Mirror will options from form
-            "mirror_will": form_data.get("mirror_will", False),
-            "mirror_poa": form_data.get("mirror_poa", False),
-            "mirror_notes": form_data.get("mirror_notes", ""),
-        }
-
-        # Step 4: Generate Main Will
-        document_path = generate_word_document(base_context)
-        log_to_excel({**form_data, "mirror_will": "No"}, document_path)
-
-        # Step 5: UPDATED - Mirror Will Generation using PROPER function
-        mirror_doc_path = None
-        if safe_bool(form_data.get("mirror_will")):
-            try:
-                # Use the FIXED generate_mirror_will function from document.py
-                mirror_doc_path = generate_mirror_will(base_context)
-                
-                # Log mirror will to Excel
-                mirror_entry = form_data.copy()
-                mirror_entry["mirror_will"] = "Yes"
-                mirror_entry["mirror_type"] = "Mirror Will"
-                log_to_excel(mirror_entry, mirror_doc_path)
-                
-            except Exception as mirror_error:
-                # If mirror generation fails, continue with main will but log the error
-                error_msg = f"Mirror will generation skipped: {str(mirror_error)}"
-                print(f"⚠️ {error_msg}")
-                # Don't fail the entire submission, just skip mirror will
-                mirror_doc_path = None
-
-        # Step 6: Success response
-        session.clear()
-        
-        # Build success message
-        message = "✅ Will generated successfully!"
-        if mirror_doc_path:
-            message += " ✅ Mirror Will created successfully."
-        else:
-            # Check if mirror was requested but failed
-            if safe_bool(form_data.get("mirror_will")):
-                message += " ⚠️ Mirror Will was not created (spouse must be primary executor)."
+        def submit():
+            # Step 2: Context assembly - UPDATED FOR UPPERCASE
+            with stage_timer("submit.build_context"):
+                base_context = SubmissionService.build_context(form_data)
 
+            # Step 3: Generate main will, mirror will and log entries
+            with stage_timer("submit.generate"):
+                return SubmissionService.generate_documents(form_data, base_context)
+
+        # A repeated submit of the same form (double-click) gets the first result
+        form_id = session.get('form_id')
+        key = f"submit:{form_id}" if form_id else None
+        result = SubmissionService.run_once(key, submit)
+
+        # Step 4: Success response
+        _clear_submitted_form(key)
+        return jsonify(result)
+
+    except SubmissionInProgressError as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+    except Exception as e:
         return jsonify({
-            "success": True,
-            "message": message,
-            "document_path": document_path,
-            "mirror_path": mirror_doc_path
-        })
+            "success": False,
+            "error": f"System error: {str(e)}"
+        }), 500
+
+
+@form_steps_bp.route('/submit-form-job', methods=['POST'])
+def submit_form_job():
+    """
+    Job mode for the final submission: validate and build the context now,
+    render and log in the background. Poll /job-status/<job_id> for the result.
+    """
+    try:
+        finished = _finished_submission("job:")
+        if finished is not None:
+            return jsonify(finished), 202
+
+        form_data = session.get('form_data', {}) or {}
+        final_data = request.get_json() or {}
+        form_data.update(final_data)
+
+        validation = SubmissionService.validate(form_data)
+        if not validation["success"]:
+            return jsonify({"success": False, "error": validation["error"]}), 400
+
+        def submit():
+            base_context = SubmissionService.build_context(form_data)
+            return {"success": True, "job_id": JobService.enqueue(form_data, base_context), "status": "queued"}
+
+        # A repeated submit of the same form is answered with the job already queued
+        form_id = session.get('form_id')
+        key = f"job:{form_id}" if form_id else None
+        result = SubmissionService.run_once(key, submit)
+
+        _clear_submitted_form(key)
+        return jsonify(result), 202
 
+    except SubmissionInProgressError as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+    except QueueFullError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     except Exception as e:
         return jsonify({
             "success": False,
             "error": f"System error: {str(e)}"
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@form_steps_bp.route('/job-status/<job_id>')
+def job_status(job_id):
+    """Report a generation job's status, with document paths once done"""
+    job = JobService.get_job(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Unknown job"}), 404
+
+    response = {"success": True, "job_id": job["id"], "status": job["status"]}
+    if job["status"] == "done":
+        response.update(job["result"])
+    elif job["status"] == "failed":
+        response["success"] = False
+        response["error"] = job["error"]
+    return jsonify(response)
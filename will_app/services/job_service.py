@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from contextlib import closing
+from datetime import datetime
+
+from config import Config
+from logic.submission_store import connect
+from services.submission_service import SubmissionService
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the job backlog is at Config.JOB_QUEUE_LIMIT"""
+
+
+class JobService:
+    """
+    Background document-generation jobs.
+
+    Jobs are persisted in the submission store's `jobs` table, so queued work
+    survives a restart. A bounded pool of worker threads claims them oldest
+    first; shutdown() stops intake and lets the workers drain the backlog.
+    """
+
+    _threads = []
+    _wakeup = threading.Condition()
+    _stopping = False
+    _owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def _now():
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @classmethod
+    def start(cls, workers=None):
+        """Start the worker pool and resume jobs interrupted by a previous run"""
+        if cls._threads:
+            return
+        cls._stopping = False
+        cls._owner = f"{socket.gethostname()}:{os.getpid()}"
+        cls._requeue_orphaned_jobs()
+        for n in range(workers or Config.JOB_WORKERS):
+            t = threading.Thread(target=cls._worker, name=f"will-job-worker-{n + 1}", daemon=True)
+            t.start()
+            cls._threads.append(t)
+        logger.info(f"Started {len(cls._threads)} document job worker(s)")
+
+    @classmethod
+    def shutdown(cls, timeout=None):
+        """Stop accepting jobs and wait for the workers to drain the queue"""
+        if not cls._threads:
+            return
+        with cls._wakeup:
+            cls._stopping = True
+            cls._wakeup.notify_all()
+        timeout = Config.JOB_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        deadline = datetime.now().timestamp() + timeout
+        for t in cls._threads:
+            t.join(max(deadline - datetime.now().timestamp(), 0))
+        pending = [t for t in cls._threads if t.is_alive()]
+        if pending:
+            logger.warning(f"{len(pending)} job worker(s) still busy at shutdown; remaining jobs resume on restart")
+        cls._threads = []
+
+    @classmethod
+    def enqueue(cls, form_data, context):
+        """Persist a generation job and wake a worker. Returns the job id."""
+        if cls._stopping:
+            raise QueueFullError("Job queue is shutting down")
+
+        job_id = str(uuid.uuid4())
+        with closing(connect()) as conn, conn:
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= Config.JOB_QUEUE_LIMIT:
+                raise QueueFullError("Too many documents are being generated, please retry shortly")
+            conn.execute(
+                "INSERT INTO jobs (id, status, created_at, form_data, context) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, cls._now(), json.dumps(form_data, default=str), json.dumps(context, default=str)),
+            )
+
+        with cls._wakeup:
+            cls._wakeup.notify()
+        return job_id
+
+    @staticmethod
+    def get_job(job_id):
+        """Return the public view of a job, or None if unknown"""
+        with closing(connect()) as conn:
+            row = conn.execute(
+                "SELECT id, status, created_at, started_at, finished_at, result, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    @classmethod
+    def _claim_next(cls):
+        """Atomically move the oldest queued job to running"""
+        with closing(connect()) as conn:
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, form_data, context FROM jobs WHERE status = 'queued' ORDER BY created_at, rowid LIMIT 1"
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ?, owner = ? WHERE id = ?",
+                        (cls._now(), cls._owner, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if not row:
+            return None
+        return row["id"], json.loads(row["form_data"]), json.loads(row["context"])
+
+    @classmethod
+    def _finish(cls, job_id, result=None, error=None):
+        with closing(connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                (
+                    "failed" if error else "done",
+                    cls._now(),
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    job_id,
+                ),
+            )
+
+    @classmethod
+    def _worker(cls):
+        while True:
+            claimed = cls._claim_next()
+            if claimed is None:
+                with cls._wakeup:
+                    if cls._stopping:
+                        return
+                    cls._wakeup.wait(timeout=5)
+                continue
+
+            job_id, form_data, context = claimed
+            try:
+                result = SubmissionService.generate_documents(form_data, context)
+                cls._finish(job_id, result=result)
+            except Exception as e:
+                logger.error(f"❌ Job {job_id} failed: {str(e)}", exc_info=True)
+                cls._finish(job_id, error=str(e))
+
+    @classmethod
+    def _requeue_orphaned_jobs(cls):
+        """Put back jobs left 'running' by a process on this host that no longer exists"""
+        host = socket.gethostname()
+        with closing(connect()) as conn, conn:
+            rows = conn.execute("SELECT id, owner FROM jobs WHERE status = 'running'").fetchall()
+            for row in rows:
+                owner_host, _, pid = (row["owner"] or "").rpartition(":")
+                if owner_host == host and pid.isdigit() and not _pid_alive(int(pid)):
+                    conn.execute("UPDATE jobs SET status = 'queued', owner = NULL WHERE id = ?", (row["id"],))
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import secrets
+import time
+from contextlib import closing
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from logic.submission_store import connect
+
+_serializer = TaggedJSONSerializer()
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session whose data lives on the server; the cookie only carries its id"""
+
+    def __init__(self, initial=None, sid=None, new=False, expires_at=0):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.modified = False
+
+
+class FilesystemSessionBackend:
+    """One JSON file per session; the file's mtime marks the last activity"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.directory, hashlib.sha256(sid.encode()).hexdigest())
+
+    def load(self, sid, idle_timeout):
+        path = self._path(sid)
+        try:
+            expires_at = os.path.getmtime(path) + idle_timeout
+            if expires_at < time.time():
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as fh:
+                return _serializer.loads(fh.read()), expires_at
+        except (OSError, ValueError):
+            return None
+
+    def save(self, sid, data, idle_timeout):
+        path = self._path(sid)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(_serializer.dumps(data))
+        os.replace(tmp, path)
+
+    def touch(self, sid, idle_timeout):
+        try:
+            os.utime(self._path(sid))
+        except OSError:
+            pass
+
+    def delete(self, sid):
+        try:
+            os.remove(self._path(sid))
+        except OSError:
+            pass
+
+    def cleanup(self, idle_timeout):
+        cutoff = time.time() - idle_timeout
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class SqliteSessionBackend:
+    """Sessions table in the submission store database"""
+
+    def load(self, sid, idle_timeout):
+        with closing(connect()) as conn:
+            row = conn.execute("SELECT data, expires_at FROM sessions WHERE id = ?", (sid,)).fetchone()
+        if not row or row["expires_at"] < time.time():
+            return None
+        return _serializer.loads(row["data"]), row["expires_at"]
+
+    def save(self, sid, data, idle_timeout):
+        with closing(connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                (sid, _serializer.dumps(data), time.time() + idle_timeout),
+            )
+
+    def touch(self, sid, idle_timeout):
+        with closing(connect()) as conn, conn:
+            conn.execute("UPDATE sessions SET expires_at = ? WHERE id = ?", (time.time() + idle_timeout, sid))
+
+    def delete(self, sid):
+        with closing(connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+    def cleanup(self, idle_timeout):
+        with closing(connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Flask session interface backed by a server-side store.
+    The cookie holds a signed random session id; drafts idle for longer
+    than idle_timeout seconds expire and are purged periodically.
+    """
+
+    CLEANUP_INTERVAL = 600
+    # A session read but not changed has its expiry pushed back at most this often (seconds)
+    TOUCH_INTERVAL = 60
+    # Asset requests never use the session; skip the store round trip (and the Vary: Cookie)
+    SESSIONLESS_PATHS = ("/assets/", "/static/")
+
+    def __init__(self, backend, idle_timeout):
+        self.backend = backend
+        self.idle_timeout = idle_timeout
+        self._last_cleanup = 0
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt="server-side-session")
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+        if request.path.startswith(self.SESSIONLESS_PATHS):
+            return self.make_null_session(app)
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                loaded = self.backend.load(sid, self.idle_timeout)
+                if loaded is not None:
+                    data, expires_at = loaded
+                    return ServerSideSession(data, sid=sid, expires_at=expires_at)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        self._maybe_cleanup()
+
+        if not session:
+            if session.modified:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified:
+            self.backend.save(session.sid, dict(session), self.idle_timeout)
+        elif session.accessed and session.expires_at < time.time() + self.idle_timeout - self.TOUCH_INTERVAL:
+            self.backend.touch(session.sid, self.idle_timeout)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+        if not self.should_set_cookie(app, session) and not session.new:
+            return
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid.encode()).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def _maybe_cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup > self.CLEANUP_INTERVAL:
+            self._last_cleanup = now
+            self.backend.cleanup(self.idle_timeout)
+
+
+def create_session_interface(config):
+    """Build the session interface named by config.SESSION_BACKEND ('cookie' keeps Flask's default)"""
+    if config.SESSION_BACKEND == "cookie":
+        return None
+    if config.SESSION_BACKEND == "filesystem":
+        backend = FilesystemSessionBackend(config.SESSION_FILE_DIR)
+    elif config.SESSION_BACKEND == "sqlite":
+        backend = SqliteSessionBackend()
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {config.SESSION_BACKEND}")
+    return ServerSideSessionInterface(backend, config.SESSION_IDLE_TIMEOUT)
@@ -0,0 +1,145 @@
+import time
+
+from config import Config
+from helpers.validators import validate_form_data
+from logic.excel_logger import log_to_excel
+from logic.submission_store import (
+    claim_submission_key, finish_submission_key, release_submission_key, get_submission_key,
+)
+from logic.models import Will
+from logic.serializers import will_to_context
+from logic.render_pool import render_documents
+
+
+class SubmissionInProgressError(Exception):
+    """Raised when a submission with the same idempotency key is still being processed"""
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when an idempotency key is sent again with a different request"""
+
+
+class SubmissionService:
+    """Service for turning a completed form into generated documents"""
+
+    @staticmethod
+    def run_once(key, submit, request_hash=None):
+        """
+        Run submit() at most once per idempotency key and return its result.
+        A repeat of the key (a double-click, a client retry) gets the first
+        result; while the first request is still running it waits up to
+        Config.IDEMPOTENCY_WAIT seconds, then raises SubmissionInProgressError.
+        Given request_hash, a repeat with a different hash raises
+        IdempotencyKeyReusedError instead of returning someone else's result.
+        If submit() raises, the key is released so a retry runs again.
+        Without a key, submit() simply runs.
+        """
+        if not key:
+            return submit()
+
+        deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT
+        while True:
+            existing = claim_submission_key(key, Config.IDEMPOTENCY_STALE, Config.IDEMPOTENCY_TTL, request_hash)
+            if existing is None:
+                break
+            if existing["status"] == "mismatch":
+                raise IdempotencyKeyReusedError("This Idempotency-Key was already used with a different request")
+            if existing["status"] == "done":
+                return existing["result"]
+            if time.monotonic() >= deadline:
+                raise SubmissionInProgressError("This submission is already being processed")
+            time.sleep(0.2)
+
+        try:
+            result = submit()
+        except BaseException:
+            release_submission_key(key)
+            raise
+        finish_submission_key(key, result)
+        return result
+
+    @staticmethod
+    def finished_result(key):
+        """The stored result of a completed run_once() for key, or None"""
+        existing = get_submission_key(key) if key else None
+        if existing and existing["status"] == "done":
+            return existing["result"]
+        return None
+
+    @staticmethod
+    def validate(form_data):
+        """Validate the complete form before any document work"""
+        return validate_form_data(form_data)
+
+    @staticmethod
+    def build_context(form_data):
+        """Assemble the template context from the flat form data"""
+        return will_to_context(Will.from_form(form_data))
+
+    @staticmethod
+    def build_mirror_context(form_data):
+        """
+        Template context for the spouse's mirror will.
+        Raises ValueError when the primary executor is not the spouse.
+        """
+        return will_to_context(Will.from_form(form_data).mirrored())
+
+    @staticmethod
+    def generate_documents(form_data, base_context):
+        """
+        Render the main will (and mirror will if requested) and log both.
+        Returns the success payload used by the submit endpoints.
+        """
+        # One parse of the form serves the mirror context and both log rows
+        will = Will.from_form(form_data)
+
+        # Render main will and (if requested) mirror will concurrently
+        tasks = [("will", base_context)]
+        mirror_error = None
+        if will.mirror_will:
+            try:
+                tasks.append(("mirror", will_to_context(will.mirrored())))
+            except ValueError as e:
+                mirror_error = str(e)
+        rendered = render_documents(tasks)
+        if mirror_error:
+            rendered["mirror"] = {"path": None, "error": mirror_error}
+
+        # Main Will failure fails the submission
+        if rendered["will"]["error"]:
+            raise Exception(rendered["will"]["error"])
+        document_path = rendered["will"]["path"]
+        log_to_excel({**form_data, "mirror_will": "No"}, document_path)
+
+        # UPDATED - Mirror Will result (context built by Will.mirrored)
+        mirror_doc_path = None
+        if "mirror" in rendered:
+            if rendered["mirror"]["error"]:
+                # If mirror generation fails, continue with main will but log the error
+                error_msg = f"Mirror will generation skipped: {rendered['mirror']['error']}"
+                print(f"⚠️ {error_msg}")
+                # Don't fail the entire submission, just skip mirror will
+            else:
+                mirror_doc_path = rendered["mirror"]["path"]
+
+                # Log mirror will to Excel
+                mirror_entry = form_data.copy()
+                mirror_entry["mirror_will"] = "Yes"
+                mirror_entry["mirror_type"] = "Mirror Will"
+                log_to_excel(mirror_entry, mirror_doc_path)
+
+        # Build success message
+        message = "✅ Will generated successfully!"
+        if mirror_doc_path:
+            message += " ✅ Mirror Will created successfully."
+        else:
+            # Check if mirror was requested but failed
+            if will.mirror_will:
+                message += " ⚠️ Mirror Will was not created (spouse must be primary executor)."
+
+        return {
+            "success": True,
+            "message": message,
+            "document_path": document_path,
+            "mirror_path": mirror_doc_path
+        }
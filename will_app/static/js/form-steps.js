@@ -53,63 +53,9 @@ class FormSteps {
         }
     }
 
-    // Validate step before proceeding
+    // Validate step before proceeding (same rules as the server, see validation.js)
     validateStep(stepNumber, formData) {
-        switch(stepNumber) {
-            case 1:
-                return this.validateStep1(formData);
-            case 2:
-                return this.validateStep2(formData);
-            // Add validation for other steps
-            default:
-                return { valid: true };
-        }
-    }
-
-    validateStep1(formData) {
-        const errors = [];
-        
-        if (!formData.name) {
-            errors.push('Full name is required');
-        }
-        
-        if (!formData.gender) {
-            errors.push('Gender is required');
-        }
-        
-        if (!formData.dob) {
-            errors.push('Date of birth is required');
-        }
-        
-        if (!formData.phone) {
-            errors.push('Phone number is required');
-        }
-        
-        if (!formData.email) {
-            errors.push('Email is required');
-        }
-        
-        if (formData.phone && !/^\d{10}$/.test(formData.phone.replace(/\D/g, ''))) {
-            errors.push('Phone number must be 10 digits');
-        }
-        
-        if (formData.email && !formData.email.includes('@')) {
-            errors.push('Valid email is required');
-        }
-
-        return {
-            valid: errors.length === 0,
-            errors: errors
-        };
-    }
-
-    validateStep2(formData) {
-        const errors = [];
-        
-        if (!formData.exec1_name || !formData.exec1_relation) {
-            errors.push('First executor name and relation are required');
-        }
-        
+        const errors = WillValidation.validateStep(stepNumber, formData);
         return {
             valid: errors.length === 0,
             errors: errors
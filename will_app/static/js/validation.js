@@ -1,4 +1,92 @@
-// Additional validation functions - will be expanded
-console.log('Validation module loaded');
+// Client-side step validation.
+// Runs the same declarative rules as the server (helpers/validation_schema.py),
+// which base.html embeds as JSON in <script id="validation-schema">.
+const WillValidation = (() => {
+    let schema = null;
 
-// Placeholder for now - will add more validation as we build steps
\ No newline at end of file
+    function load() {
+        if (!schema) {
+            const el = document.getElementById('validation-schema');
+            schema = el ? JSON.parse(el.textContent) : { flag_values: [], steps: {} };
+        }
+        return schema;
+    }
+
+    const isFlag = value => load().flag_values.includes(value);
+    const filled = value => Boolean(value);
+
+    // Same grouping as helpers/indexed_fields.parse_indexed_fields (beneficiaries only)
+    function groupBeneficiaries(data) {
+        const fields = ['name', 'relation', 'dob', 'share'];
+        const records = {};
+        Object.entries(data).forEach(([key, value]) => {
+            if (!key.startsWith('beneficiary_')) return;
+            const rest = key.slice('beneficiary_'.length);
+            const cut = rest.indexOf('_');
+            if (cut < 0) return;
+            const head = rest.slice(0, cut), tail = rest.slice(cut + 1);
+            if (/^\d+$/.test(head) && fields.includes(tail)) {
+                (records[head] = records[head] || {})[tail] = value;
+            } else if (/^\d+$/.test(tail) && fields.includes(head)) {
+                records[tail] = records[tail] || {};
+                if (!(head in records[tail])) records[tail][head] = value;
+            }
+        });
+        return Object.keys(records).sort((a, b) => a - b).map(n => [n, records[n]]);
+    }
+
+    const checks = {
+        required: (rule, data) => rule.fields.every(f => filled(data[f])) ? [] : [rule.message],
+        contains: (rule, data) =>
+            filled(data[rule.field]) && !String(data[rule.field]).includes(rule.value) ? [rule.message] : [],
+        min_length: (rule, data) => {
+            if (!filled(data[rule.field])) return [];
+            const ignore = rule.ignore || '';
+            const length = [...String(data[rule.field])].filter(c => !ignore.includes(c)).length;
+            return length < rule.value ? [rule.message] : [];
+        },
+        pattern: (rule, data) =>
+            filled(data[rule.field]) && !new RegExp(rule.pattern).test(String(data[rule.field])) ? [rule.message] : [],
+        contains_any: (rule, data) => {
+            if (!filled(data[rule.field])) return [];
+            const value = String(data[rule.field]).toLowerCase();
+            return rule.values.some(v => value.includes(v.toLowerCase())) ? [] : [rule.message];
+        },
+        group_any: (rule, data, groups) =>
+            groups.some(([, r]) => rule.fields.every(f => filled(r[f]))) ? [] : [rule.message],
+        group_total: (rule, data, groups) => {
+            const errors = [];
+            let total = 0;
+            groups.forEach(([n, r]) => {
+                if (!rule.fields.every(f => filled(r[f]))) return;
+                const raw = r[rule.field];
+                const share = raw ? Number(raw) : 0;
+                if (raw && (String(raw).trim() === '' || Number.isNaN(share))) {
+                    errors.push(rule.invalid_message.replace('{n}', n));
+                } else {
+                    total += share;
+                }
+            });
+            if (!errors.length && Math.abs(total - rule.total) > rule.tolerance) {
+                errors.push(rule.message.replace('{total}', total.toFixed(2)));
+            }
+            return errors;
+        },
+    };
+
+    // Every error for one step's data; an empty array when it is valid
+    function validateStep(step, data) {
+        const rules = load().steps[String(step)] || [];
+        const groups = groupBeneficiaries(data);
+        const errors = [];
+        rules.forEach(rule => {
+            if (rule.when && !isFlag(data[rule.when])) return;
+            if (rule.unless && isFlag(data[rule.unless])) return;
+            const check = checks[rule.type];
+            if (check) errors.push(...check(rule, data, groups));
+        });
+        return errors;
+    }
+
+    return { validateStep };
+})();
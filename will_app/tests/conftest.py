@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The app imports its modules from will_app/ (from config import Config, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Fresh submission store and documents folder in a temporary working directory"""
+    from logic import submission_store
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(submission_store, "_schema_ready", False)
+    return tmp_path
@@ -0,0 +1,104 @@
+import os
+import zipfile
+from datetime import datetime
+
+from config import Config
+from logic import document_storage, submission_store
+from logic.document_storage import (
+    apply_retention, archive_months, archive_path, delete_documents, find_stored_document, shard_flat_documents,
+    shard_path,
+)
+
+
+def _save(filename, created_at, folder=None, data=None, monkeypatch=None):
+    """Write a document and index it as created at `created_at` ('YYYY-MM-DD HH:MM:SS')"""
+    folder = folder or os.path.dirname(shard_path(filename, datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")))
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, filename)
+    with open(path, "wb") as f:
+        f.write(data or filename.encode())
+    with monkeypatch.context() as m:
+        m.setattr(submission_store, "_now", lambda: created_at)
+        submission_store.record_document(path)
+    return path
+
+
+def _read(filename):
+    with find_stored_document(filename).open() as f:
+        return f.read()
+
+
+def test_shard_flat_documents_moves_them_into_their_day(store, monkeypatch):
+    flat = _save("Will_A.docx", "2024-03-05 10:00:00", folder=Config.DOCUMENTS_FOLDER, monkeypatch=monkeypatch)
+
+    assert shard_flat_documents() == 1
+    target = os.path.join(Config.DOCUMENTS_FOLDER, "2024", "03", "05", "Will_A.docx")
+    assert not os.path.exists(flat)
+    assert os.path.isfile(target)
+    assert submission_store.find_document("Will_A.docx")["path"] == target
+    assert shard_flat_documents() == 0
+
+
+def test_archive_months_packs_old_documents_into_monthly_zips(store, monkeypatch):
+    old = _save("Will_A.docx", "2024-01-10 09:00:00", monkeypatch=monkeypatch)
+    _save("Will_B.docx", "2024-01-20 09:00:00", monkeypatch=monkeypatch)
+    recent = _save("Will_C.docx", "2024-03-01 09:00:00", monkeypatch=monkeypatch)
+
+    assert archive_months("2024-02-01") == 2
+    archive = archive_path("2024-01")
+    with zipfile.ZipFile(archive) as zf:
+        assert sorted(zf.namelist()) == ["Will_A.docx", "Will_B.docx"]
+    assert not os.path.exists(old)
+    assert not os.path.isdir(os.path.dirname(old))
+    assert os.path.isfile(recent)
+
+    doc = find_stored_document("Will_A.docx")
+    assert doc.archive == archive
+    assert _read("Will_A.docx") == b"Will_A.docx"
+    assert archive_months("2024-02-01") == 0
+
+
+def test_delete_documents_removes_loose_and_archived_copies(store, monkeypatch):
+    _save("Will_A.docx", "2024-01-10 09:00:00", monkeypatch=monkeypatch)
+    _save("Will_B.docx", "2024-01-20 09:00:00", monkeypatch=monkeypatch)
+    loose = _save("Will_C.docx", "2024-03-01 09:00:00", monkeypatch=monkeypatch)
+    archive_months("2024-02-01")
+
+    assert sorted(delete_documents(["Will_A.docx", "Will_C.docx", "Missing.docx"])) == ["Will_A.docx", "Will_C.docx"]
+    assert not os.path.exists(loose)
+    assert find_stored_document("Will_A.docx") is None
+    assert find_stored_document("Will_C.docx") is None
+    assert submission_store.find_document("Will_A.docx") is None
+    with zipfile.ZipFile(archive_path("2024-01")) as zf:
+        assert zf.namelist() == ["Will_B.docx"]
+
+    # The last member gone, the archive itself is removed
+    assert delete_documents(["Will_B.docx"]) == ["Will_B.docx"]
+    assert not os.path.exists(archive_path("2024-01"))
+
+
+def test_delete_documents_finds_a_document_archived_after_its_lookup(store, monkeypatch):
+    _save("Will_A.docx", "2024-01-10 09:00:00", monkeypatch=monkeypatch)
+    # The first lookup still sees the loose file, which is then packed by maintenance
+    lookups = [find_stored_document("Will_A.docx")]
+    archive_months("2024-02-01")
+    monkeypatch.setattr(document_storage, "find_stored_document",
+                        lambda name: lookups.pop() if lookups else find_stored_document(name))
+
+    assert delete_documents(["Will_A.docx"]) == ["Will_A.docx"]
+    assert not os.path.exists(archive_path("2024-01"))
+    assert submission_store.find_document("Will_A.docx") is None
+
+
+def test_apply_retention_deletes_expired_documents_and_stale_index_rows(store, monkeypatch):
+    _save("Will_A.docx", "2023-12-01 09:00:00", monkeypatch=monkeypatch)
+    gone = _save("Will_B.docx", "2024-01-05 09:00:00", monkeypatch=monkeypatch)
+    kept = _save("Will_C.docx", "2024-06-01 09:00:00", monkeypatch=monkeypatch)
+    archive_months("2024-01-01")
+    os.remove(gone)
+
+    assert apply_retention("2024-02-01") == 1
+    assert find_stored_document("Will_A.docx") is None
+    assert submission_store.find_document("Will_B.docx") is None
+    assert os.path.isfile(kept)
+    assert [d["filename"] for d in submission_store.iter_document_locations()] == ["Will_C.docx"]
@@ -0,0 +1,171 @@
+import pytest
+
+from config import Config
+from services.job_service import JobService
+from services.submission_service import (
+    IdempotencyKeyReusedError, SubmissionInProgressError, SubmissionService,
+)
+
+
+class Counter:
+    """submit() stand-in: counts its calls and returns a distinct result per call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"success": True, "run": self.calls}
+
+
+# ============================================================
+# run_once
+# ============================================================
+def test_run_once_replays_the_first_result(store):
+    submit = Counter()
+
+    assert SubmissionService.run_once("submit:form-1", submit) == {"success": True, "run": 1}
+    assert SubmissionService.run_once("submit:form-1", submit) == {"success": True, "run": 1}
+    assert SubmissionService.run_once("submit:form-2", submit) == {"success": True, "run": 2}
+    assert submit.calls == 2
+
+
+def test_run_once_without_a_key_always_runs(store):
+    submit = Counter()
+
+    SubmissionService.run_once(None, submit)
+    SubmissionService.run_once(None, submit)
+    assert submit.calls == 2
+
+
+def test_run_once_rejects_a_reused_key_with_a_different_request(store):
+    submit = Counter()
+    SubmissionService.run_once("api:client:abc", submit, request_hash="body-1")
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        SubmissionService.run_once("api:client:abc", submit, request_hash="body-2")
+    assert SubmissionService.run_once("api:client:abc", submit, request_hash="body-1") == {"success": True, "run": 1}
+    assert submit.calls == 1
+
+
+def test_run_once_releases_the_key_when_submit_fails(store):
+    def fail():
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        SubmissionService.run_once("submit:form-1", fail)
+    assert SubmissionService.finished_result("submit:form-1") is None
+
+    submit = Counter()
+    assert SubmissionService.run_once("submit:form-1", submit) == {"success": True, "run": 1}
+    assert SubmissionService.finished_result("submit:form-1") == {"success": True, "run": 1}
+
+
+def test_run_once_reports_a_submission_still_in_progress(store, monkeypatch):
+    monkeypatch.setattr(Config, "IDEMPOTENCY_WAIT", 0)
+
+    def submit():
+        # The same key arriving while the first run is still going
+        with pytest.raises(SubmissionInProgressError):
+            SubmissionService.run_once("submit:form-1", Counter())
+        return {"success": True}
+
+    assert SubmissionService.run_once("submit:form-1", submit) == {"success": True}
+
+
+# ============================================================
+# Routes
+# ============================================================
+@pytest.fixture
+def client(store, monkeypatch):
+    """App with two API keys whose documents are faked (no rendering)"""
+    from app import create_app
+
+    class TestConfig(Config):
+        SECRET_KEY = "test-secret"
+        ASSET_BUILD_FOLDER = str(store / "build")
+        TESTING = True
+
+    generated = Counter()
+
+    def generate_documents(form_data, context):
+        generated()
+        return {"message": "ok", "document_path": f"Will_{generated.calls}.docx", "mirror_path": None}
+
+    def enqueue(form_data, context):
+        generated()
+        return f"job-{generated.calls}"
+
+    # The API decorator reads the keys from Config itself
+    monkeypatch.setattr(Config, "API_KEYS", frozenset({"key-a", "key-b"}))
+    monkeypatch.setattr(SubmissionService, "validate", staticmethod(lambda form_data: {"success": True}))
+    monkeypatch.setattr(SubmissionService, "build_context", staticmethod(lambda form_data: {}))
+    monkeypatch.setattr(SubmissionService, "generate_documents", staticmethod(generate_documents))
+    monkeypatch.setattr(JobService, "enqueue", staticmethod(enqueue))
+    client = create_app(TestConfig, start_background=False).test_client()
+    client.generated = generated
+    return client
+
+
+def _post_will(client, api_key, body, idempotency_key="abc"):
+    return client.post("/api/wills", json=body, headers={"X-API-Key": api_key, "Idempotency-Key": idempotency_key})
+
+
+def test_api_replays_a_repeated_idempotency_key(client):
+    first = _post_will(client, "key-a", {"name": "A"})
+    again = _post_will(client, "key-a", {"name": "A"})
+
+    assert first.status_code == again.status_code == 200
+    assert again.json["document_id"] == first.json["document_id"]
+    assert client.generated.calls == 1
+
+
+def test_api_rejects_a_reused_idempotency_key_with_a_different_body(client):
+    _post_will(client, "key-a", {"name": "A"})
+    reused = _post_will(client, "key-a", {"name": "B"})
+
+    assert reused.status_code == 422
+    assert reused.json["status"] == "invalid"
+    assert client.generated.calls == 1
+
+
+def test_api_idempotency_keys_are_scoped_per_api_key(client):
+    first = _post_will(client, "key-a", {"name": "A"})
+    other = _post_will(client, "key-b", {"name": "A"})
+
+    assert other.status_code == 200
+    assert other.json["document_id"] != first.json["document_id"]
+    assert client.generated.calls == 2
+
+
+def test_api_retry_after_a_failed_submission_generates_again(client, monkeypatch):
+    def fail(form_data, context):
+        raise RuntimeError("render failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(SubmissionService, "generate_documents", staticmethod(fail))
+        assert _post_will(client, "key-a", {"name": "A"}).status_code == 500
+
+    retry = _post_will(client, "key-a", {"name": "A"})
+    assert retry.status_code == 200
+    assert client.generated.calls == 1
+
+
+@pytest.mark.parametrize("path, status", [("/submit-complete-form", 200), ("/submit-form-job", 202)])
+def test_form_submit_repeated_after_it_finished_gets_the_first_result(client, path, status):
+    with client.session_transaction() as s:
+        s["form_id"] = "form-1"
+        s["form_data"] = {"name": "A"}
+
+    first = client.post(path, json={})
+    late = client.post(path, json={})
+
+    assert first.status_code == late.status_code == status
+    assert late.json == first.json
+    assert client.generated.calls == 1
+
+    # A new form in the same browser is not answered from the old one
+    with client.session_transaction() as s:
+        s["form_id"] = "form-2"
+        s["form_data"] = {"name": "A"}
+    assert client.post(path, json={}).json != first.json
@@ -0,0 +1,37 @@
+import pytest
+
+from logic import submission_store
+from logic.submission_store import find_documents, forget_documents, get_counters, record_document
+
+
+@pytest.mark.parametrize("cursor", ["NQ==", "eyJhIjoxfQ==", "WyJ4Il0=", "W251bGwsIDFd", "not base64!"])
+def test_find_documents_rejects_malformed_cursors(store, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        find_documents(cursor=cursor, sort="newest")
+
+
+def test_find_documents_pages_with_its_own_cursor(store):
+    for name in ("Will_A.docx", "Will_B.docx", "Will_C.docx"):
+        (store / name).write_bytes(b"x")
+        record_document(str(store / name))
+
+    for sort in ("name", "newest"):
+        first, cursor = find_documents(limit=2, sort=sort)
+        rest, end = find_documents(limit=2, cursor=cursor, sort=sort)
+        assert len(first) == 2 and len(rest) == 1 and end is None
+
+
+def test_forget_documents_uncounts_indexed_documents_on_their_own_day(store, monkeypatch):
+    for name, created_at in (("Will_Old.docx", "2024-01-10 09:00:00"), ("Will_New.docx", "2024-06-01 09:00:00")):
+        (store / name).write_bytes(b"x")
+        with monkeypatch.context() as m:
+            m.setattr(submission_store, "_now", lambda: created_at)
+            record_document(str(store / name))
+
+    # Unindexed flat files are deleted too, but were never counted
+    forget_documents(["Will_Old.docx", "Flat_Unindexed.docx"])
+    forget_documents(["Will_Old.docx"])
+
+    assert get_counters("2024-01-10") == {"total": {"documents": 1}, "day": {"documents": 0}}
+    assert get_counters("2024-06-01")["day"] == {"documents": 1}
+    assert get_counters(submission_store._now()[:10])["day"].get("documents", 0) == 0
@@ -0,0 +1,19 @@
+"""
+WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py
+
+gunicorn.conf.py preloads this module in the master process: the app factory
+runs, the blueprints, docxtpl, lxml and openpyxl are imported, and
+logic.warmup renders a dummy will so the template cache is hot. Workers are
+forked afterwards and share all of it copy-on-write; each worker starts its
+own job threads after the fork (threads do not survive one).
+"""
+from app import create_app
+from config import Config
+
+app = create_app(Config, start_background=False)
+
+if Config.WARMUP:
+    from logic.warmup import warm_up
+    warm_up(app)